@@ -1,76 +1,142 @@
-from typing import Generator, Optional
-from fastapi import Depends, HTTPException, status
+from typing import Annotated, AsyncGenerator, Callable, Optional
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
-from jose import JWTError, jwt
+from sqlalchemy.ext.asyncio import AsyncSession
 import logging
 
-from app.core.database import SessionLocal
+from app.core.cache import TTLCache
+from app.core.database import AsyncSessionLocal
 from app.core.config import settings
 from app.core.security import get_user_id_from_token
+from app.core.store import store
 from app.models.user import User
 from app.schemas.user import TokenData
 
+
+class _BearerScheme(OAuth2PasswordBearer):
+    """
+    OAuth2PasswordBearer with a minimal header parse.
+    Subclassing keeps the scheme in the OpenAPI docs while each request
+    only does a header lookup and a prefix check.
+    """
+
+    async def __call__(self, request: Request) -> str:
+        authorization = request.headers.get("authorization")
+        if not authorization or authorization[:7].lower() != "bearer ":
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Not authenticated",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        return authorization[7:]
+
+
 # OAuth2 scheme for token authentication
-oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/auth/login")
+oauth2_scheme = _BearerScheme(
+    tokenUrl=f"{settings.API_V1_STR}/auth/login", scheme_name="OAuth2PasswordBearer"
+)
 
 logger = logging.getLogger(__name__)
 
+# Authenticated users keyed by ID. Cached instances are detached from any
+# session: endpoints that modify the user must load their own copy and
+# call invalidate_user_cache() afterwards.
+_user_cache = TTLCache(maxsize=10_000, ttl=settings.USER_CACHE_TTL)
 
-def get_db() -> Generator:
-    """
-    Dependency to get database session.
-    Automatically closes session after request.
-    """
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
 
+def invalidate_user_cache(user_id: int) -> None:
+    """Drop a user from the authentication cache after it changes."""
+    _user_cache.pop(user_id)
 
-async def get_current_user(
-    db: Session = Depends(get_db), token: str = Depends(oauth2_scheme)
-) -> User:
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
     """
-    Dependency to get current authenticated user.
+    Dependency to get an async database session.
+    Rolls back if the endpoint raises and closes session after request.
     """
-    credentials_exception = HTTPException(
+    async with AsyncSessionLocal() as db:
+        try:
+            yield db
+        except Exception:
+            await db.rollback()
+            raise
+
+
+def _credentials_exception() -> HTTPException:
+    """Build the 401 raised for missing or invalid credentials."""
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
 
-    try:
-        # Decode the token
-        payload = jwt.decode(
-            token,
-            settings.SECRET_KEY,
-            algorithms=[settings.ALGORITHM]
-        )
-        
-        user_id: str = payload.get("sub")
-        if user_id is None:
-            logger.error(f"No 'sub' claim in token payload: {payload}")
-            raise credentials_exception
-            
-    except JWTError as e:
-        logger.error(f"JWT decode error: {str(e)}")
-        raise credentials_exception
-    except Exception as e:
-        logger.error(f"Unexpected error decoding token: {str(e)}")
-        raise credentials_exception
-
-    # Get user from database
-    try:
-        user = db.query(User).filter(User.id == int(user_id)).first()
-    except ValueError:
-        logger.error(f"Invalid user_id format: {user_id}")
-        raise credentials_exception
-        
+
+async def _load_user(db: AsyncSession, user_id: int) -> Optional[User]:
+    """
+    Load a user and detach it from the session for caching.
+    Only called on a user cache miss.
+    """
+    user = await db.get(User, user_id)
+    if user is not None:
+        db.expunge(user)
+    return user
+
+
+async def get_cached_user(
+    user_id: int, db: Optional[AsyncSession] = None
+) -> Optional[User]:
+    """
+    Get a user by ID from the authentication cache, falling back to the
+    database on a miss. Returns None if the user does not exist.
+
+    Args:
+        user_id: User ID
+        db: The request's session, if it has one; otherwise a miss uses a
+            short-lived session
+
+    Returns:
+        Detached User object, or None
+    """
+    user = _user_cache.get(user_id)
+    if user is None:
+        if db is not None:
+            user = await _load_user(db, user_id)
+        else:
+            async with AsyncSessionLocal() as own_db:
+                user = await _load_user(own_db, user_id)
+        if user is not None:
+            _user_cache.set(user_id, user)
+    return user
+
+
+async def get_current_user_id(token: str = Depends(oauth2_scheme)) -> int:
+    """
+    Dependency to get the authenticated user's ID from the bearer token.
+    Does not touch the database.
+    """
+    # Verify the token (cached for a few seconds per token)
+    user_id = get_user_id_from_token(token)
+    if user_id is None:
+        logger.error("Could not validate token")
+        raise _credentials_exception()
+
+    return user_id
+
+
+async def get_current_user(
+    user_id: int = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_async_db),
+) -> User:
+    """
+    Dependency to get current authenticated user.
+    Shares the request's async session (FastAPI resolves get_async_db once
+    per request), which only checks out a connection on a cache miss.
+    """
+    # Get user from cache, falling back to the database
+    user = await get_cached_user(user_id, db)
     if user is None:
-        logger.error(f"User not found with ID: {user_id}")
-        raise credentials_exception
+        logger.error("User not found with ID: %s", user_id)
+        raise _credentials_exception()
 
     # Check if user is active
     if not user.is_active:
@@ -121,3 +187,36 @@ async def get_current_superuser(current_user: User = Depends(get_current_user))
             status_code=status.HTTP_403_FORBIDDEN, detail="Not enough privileges"
         )
     return current_user
+
+
+# Reusable annotated dependencies for endpoint signatures
+CurrentUser = Annotated[User, Depends(get_current_active_user)]
+AsyncDBSession = Annotated[AsyncSession, Depends(get_async_db)]
+
+
+def rate_limit(scope: str, limit: int, period: int) -> Callable:
+    """
+    Build a dependency that limits each user to `limit` requests per
+    `period` seconds for each path (e.g. each market symbol).
+
+    Counters live in the shared store, so the limit holds across workers
+    when Redis is configured.
+
+    Args:
+        scope: Name used to namespace the counters
+        limit: Allowed requests per period
+        period: Window length in seconds
+
+    Returns:
+        Dependency raising 429 once the limit is exceeded
+    """
+    async def dependency(request: Request, current_user: CurrentUser) -> None:
+        key = f"rl:{scope}:{current_user.id}:{request.url.path.lower()}"
+        if await store.incr(key, ttl=period) > limit:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail=f"Rate limit exceeded. Maximum {limit} requests per {period} seconds.",
+                headers={"Retry-After": str(period)},
+            )
+
+    return dependency
@@ -4,12 +4,12 @@ Handles all account-related operations including CRUD operations.
 """
 
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from sqlalchemy.exc import SQLAlchemyError, IntegrityError
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 import logging
 
-from app.api.deps import get_db, get_current_active_user
+from app.api.deps import get_async_db, get_current_active_user
 from app.models.user import User
 from app.models.account import Account
 from app.schemas.account import AccountCreate, AccountUpdate, Account as AccountSchema
@@ -20,11 +20,23 @@ logger = logging.getLogger(__name__)
 # Initialize router
 router = APIRouter()
 
+# Columns serialized by AccountSchema
+ACCOUNT_COLUMNS = (
+    Account.id,
+    Account.user_id,
+    Account.account_name,
+    Account.account_type,
+    Account.balance,
+    Account.currency,
+    Account.created_at,
+    Account.updated_at,
+)
+
 
 @router.post("/", response_model=AccountSchema, status_code=status.HTTP_201_CREATED)
-def create_account(
+async def create_account(
     account_in: AccountCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """
@@ -37,55 +49,30 @@ def create_account(
         
     Returns:
         AccountSchema: Created account
-        
-    Raises:
-        HTTPException: If account creation fails
     """
-    try:
-        logger.info(f"User {current_user.id} creating new account: {account_in.account_name}")
-        
-        # Create account instance
-        db_account = Account(
-            **account_in.dict(),
-            user_id=current_user.id
-        )
-        
-        # Add to session and commit
-        db.add(db_account)
-        db.commit()
-        db.refresh(db_account)
-        
-        logger.info(f"Account created successfully with ID: {db_account.id}")
-        return db_account
-        
-    except IntegrityError as e:
-        db.rollback()
-        logger.error(f"Database integrity error creating account: {str(e)}")
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Account with this name may already exist or invalid data provided"
-        )
-    except SQLAlchemyError as e:
-        db.rollback()
-        logger.error(f"Database error creating account: {str(e)}")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Database error occurred while creating account"
-        )
-    except Exception as e:
-        db.rollback()
-        logger.error(f"Unexpected error creating account: {str(e)}", exc_info=True)
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"An unexpected error occurred: {str(e)}"
-        )
+    uid = current_user.id
+    logger.info("User %s creating new account: %s", uid, account_in.account_name)
+    
+    # Create account instance
+    db_account = Account(
+        **account_in.model_dump(),
+        user_id=uid
+    )
+    
+    # Add to session and commit
+    db.add(db_account)
+    await db.commit()
+    await db.refresh(db_account)
+    
+    logger.info("Account created successfully with ID: %s", db_account.id)
+    return db_account
 
 
 @router.get("/", response_model=List[AccountSchema])
-def list_accounts(
+async def list_accounts(
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """
@@ -99,44 +86,30 @@ def list_accounts(
         
     Returns:
         List[AccountSchema]: List of user's accounts
-        
-    Raises:
-        HTTPException: If fetching accounts fails
     """
-    try:
-        logger.debug(f"User {current_user.id} fetching accounts (skip={skip}, limit={limit})")
-        
-        # Query accounts with pagination
-        accounts = db.query(Account).filter(
-            Account.user_id == current_user.id
-        ).offset(skip).limit(limit).all()
-        
-        # Commit to close the transaction properly
-        db.commit()
-        
-        logger.info(f"Retrieved {len(accounts)} accounts for user {current_user.id}")
-        return accounts
-        
-    except SQLAlchemyError as e:
-        db.rollback()
-        logger.error(f"Database error fetching accounts: {str(e)}")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Database error occurred while fetching accounts"
-        )
-    except Exception as e:
-        db.rollback()
-        logger.error(f"Unexpected error fetching accounts: {str(e)}", exc_info=True)
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"An unexpected error occurred: {str(e)}"
-        )
+    uid = current_user.id
+    logger.debug("User %s fetching accounts (skip=%s, limit=%s)", uid, skip, limit)
+    
+    # Query plain rows (no ORM instances); the response model reads
+    # them through from_attributes. Ordering by id keeps OFFSET pages
+    # stable and lets the (user_id, id) index serve the scan
+    result = await db.execute(
+        select(*ACCOUNT_COLUMNS)
+        .where(Account.user_id == uid)
+        .order_by(Account.id)
+        .offset(skip)
+        .limit(limit)
+    )
+    accounts = result.all()
+    
+    logger.info("Retrieved %s accounts for user %s", len(accounts), uid)
+    return accounts
 
 
 @router.get("/{account_id}", response_model=AccountSchema)
-def get_account(
+async def get_account(
     account_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """
@@ -153,53 +126,29 @@ def get_account(
     Raises:
         HTTPException: If account not found or access denied
     """
-    try:
-        logger.debug(f"User {current_user.id} fetching account {account_id}")
-        
-        # Query account
-        account = db.query(Account).filter(
-            Account.id == account_id,
-            Account.user_id == current_user.id
-        ).first()
-        
-        # Check if account exists
-        if not account:
-            logger.warning(f"Account {account_id} not found for user {current_user.id}")
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Account with ID {account_id} not found"
-            )
-        
-        # Commit to close the transaction properly
-        db.commit()
-        
-        logger.info(f"Account {account_id} retrieved successfully")
-        return account
-        
-    except HTTPException:
-        db.rollback()
-        raise
-    except SQLAlchemyError as e:
-        db.rollback()
-        logger.error(f"Database error fetching account {account_id}: {str(e)}")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Database error occurred while fetching account"
-        )
-    except Exception as e:
-        db.rollback()
-        logger.error(f"Unexpected error fetching account {account_id}: {str(e)}", exc_info=True)
+    uid = current_user.id
+    logger.debug("User %s fetching account %s", uid, account_id)
+    
+    # Query account
+    account = await db.get(Account, account_id)
+    
+    # Check if account exists and belongs to the user
+    if account is None or account.user_id != uid:
+        logger.warning("Account %s not found for user %s", account_id, uid)
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"An unexpected error occurred: {str(e)}"
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Account with ID {account_id} not found"
         )
+    
+    logger.info("Account %s retrieved successfully", account_id)
+    return account
 
 
 @router.put("/{account_id}", response_model=AccountSchema)
-def update_account(
+async def update_account(
     account_id: int,
     account_in: AccountUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """
@@ -215,67 +164,45 @@ def update_account(
         AccountSchema: Updated account
         
     Raises:
-        HTTPException: If account not found or update fails
+        HTTPException: If account not found
     """
-    try:
-        logger.info(f"User {current_user.id} updating account {account_id}")
-        
-        # Fetch account
-        account = db.query(Account).filter(
-            Account.id == account_id,
-            Account.user_id == current_user.id
-        ).first()
-        
-        # Check if account exists
-        if not account:
-            logger.warning(f"Account {account_id} not found for user {current_user.id}")
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Account with ID {account_id} not found"
-            )
-        
-        # Update account fields
-        update_data = account_in.dict(exclude_unset=True)
-        for field, value in update_data.items():
-            setattr(account, field, value)
-        
-        # Commit changes
-        db.commit()
-        db.refresh(account)
-        
-        logger.info(f"Account {account_id} updated successfully")
-        return account
-        
-    except HTTPException:
-        db.rollback()
-        raise
-    except IntegrityError as e:
-        db.rollback()
-        logger.error(f"Database integrity error updating account {account_id}: {str(e)}")
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Invalid data provided for account update"
-        )
-    except SQLAlchemyError as e:
-        db.rollback()
-        logger.error(f"Database error updating account {account_id}: {str(e)}")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Database error occurred while updating account"
+    uid = current_user.id
+    logger.info("User %s updating account %s", uid, account_id)
+    
+    update_data = account_in.model_dump(exclude_unset=True)
+    owned = (Account.id == account_id, Account.user_id == uid)
+    
+    # Update the owned row in one statement and read it back via RETURNING
+    if update_data:
+        stmt = (
+            update(Account)
+            .where(*owned)
+            .values(**update_data)
+            .returning(*ACCOUNT_COLUMNS)
         )
-    except Exception as e:
-        db.rollback()
-        logger.error(f"Unexpected error updating account {account_id}: {str(e)}", exc_info=True)
+    else:
+        stmt = select(*ACCOUNT_COLUMNS).where(*owned)
+    account = (await db.execute(stmt)).one_or_none()
+    
+    # Check if account exists and belongs to the user
+    if account is None:
+        logger.warning("Account %s not found for user %s", account_id, uid)
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"An unexpected error occurred: {str(e)}"
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Account with ID {account_id} not found"
         )
+    
+    # Commit changes
+    await db.commit()
+    
+    logger.info("Account %s updated successfully", account_id)
+    return account
 
 
 @router.delete("/{account_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_account(
+async def delete_account(
     account_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """
@@ -290,61 +217,33 @@ def delete_account(
         None (204 No Content)
         
     Raises:
-        HTTPException: If account not found or deletion fails
+        HTTPException: If account not found
     """
-    try:
-        logger.info(f"User {current_user.id} deleting account {account_id}")
-        
-        # Fetch account
-        account = db.query(Account).filter(
-            Account.id == account_id,
-            Account.user_id == current_user.id
-        ).first()
-        
-        # Check if account exists
-        if not account:
-            logger.warning(f"Account {account_id} not found for user {current_user.id}")
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Account with ID {account_id} not found"
-            )
-        
-        # Delete account
-        db.delete(account)
-        db.commit()
-        
-        logger.info(f"Account {account_id} deleted successfully")
-        return None
-        
-    except HTTPException:
-        db.rollback()
-        raise
-    except IntegrityError as e:
-        db.rollback()
-        logger.error(f"Cannot delete account {account_id}: {str(e)}")
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Cannot delete account. It may have associated transactions."
-        )
-    except SQLAlchemyError as e:
-        db.rollback()
-        logger.error(f"Database error deleting account {account_id}: {str(e)}")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Database error occurred while deleting account"
-        )
-    except Exception as e:
-        db.rollback()
-        logger.error(f"Unexpected error deleting account {account_id}: {str(e)}", exc_info=True)
+    uid = current_user.id
+    logger.info("User %s deleting account %s", uid, account_id)
+    
+    # Fetch account
+    account = await db.get(Account, account_id)
+    
+    # Check if account exists and belongs to the user
+    if account is None or account.user_id != uid:
+        logger.warning("Account %s not found for user %s", account_id, uid)
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"An unexpected error occurred: {str(e)}"
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Account with ID {account_id} not found"
         )
+    
+    # Delete account
+    await db.delete(account)
+    await db.commit()
+    
+    logger.info("Account %s deleted successfully", account_id)
+    return None
 
 
 @router.get("/summary/balance")
-def get_account_summary(
-    db: Session = Depends(get_db),
+async def get_account_summary(
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """
@@ -356,64 +255,58 @@ def get_account_summary(
         
     Returns:
         dict: Account summary with total balance and count
-        
-    Raises:
-        HTTPException: If fetching summary fails
     """
-    try:
-        logger.debug(f"User {current_user.id} fetching account summary")
-        
-        # Fetch all accounts
-        accounts = db.query(Account).filter(
-            Account.user_id == current_user.id
-        ).all()
-        
-        # Calculate totals
-        total_balance = sum(account.balance for account in accounts)
-        account_count = len(accounts)
-        
-        # Group by account type
-        by_type = {}
-        for account in accounts:
-            acc_type = account.account_type
-            if acc_type not in by_type:
-                by_type[acc_type] = {"count": 0, "balance": 0}
-            by_type[acc_type]["count"] += 1
-            by_type[acc_type]["balance"] += account.balance
-        
-        # Commit to close transaction
-        db.commit()
-        
-        summary = {
-            "total_balance": round(total_balance, 2),
-            "account_count": account_count,
-            "by_type": by_type,
-            "accounts": [
-                {
-                    "id": acc.id,
-                    "name": acc.account_name,
-                    "type": acc.account_type,
-                    "balance": round(acc.balance, 2),
-                    "currency": acc.currency
-                }
-                for acc in accounts
-            ]
-        }
-        
-        logger.info(f"Account summary generated for user {current_user.id}")
-        return summary
-        
-    except SQLAlchemyError as e:
-        db.rollback()
-        logger.error(f"Database error fetching account summary: {str(e)}")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Database error occurred while fetching account summary"
+    uid = current_user.id
+    logger.debug("User %s fetching account summary", uid)
+    
+    # Aggregate count and balance per account type in the database
+    result = await db.execute(
+        select(
+            Account.account_type,
+            func.count(Account.id),
+            func.coalesce(func.sum(Account.balance), 0.0),
         )
-    except Exception as e:
-        db.rollback()
-        logger.error(f"Unexpected error fetching account summary: {str(e)}", exc_info=True)
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"An unexpected error occurred: {str(e)}"
-        )
\ No newline at end of file
+        .where(Account.user_id == uid)
+        .group_by(Account.account_type)
+    )
+    by_type = {
+        acc_type: {"count": count, "balance": balance}
+        for acc_type, count, balance in result.all()
+    }
+    
+    # Calculate totals from the grouped rows
+    total_balance = sum(t["balance"] for t in by_type.values())
+    account_count = sum(t["count"] for t in by_type.values())
+    
+    # Fetch only the columns needed for the account list
+    result = await db.execute(
+        select(
+            Account.id,
+            Account.account_name,
+            Account.account_type,
+            Account.balance,
+            Account.currency,
+        )
+        .where(Account.user_id == uid)
+        .order_by(Account.id)
+    )
+    accounts = result.all()
+    
+    summary = {
+        "total_balance": round(total_balance, 2),
+        "account_count": account_count,
+        "by_type": by_type,
+        "accounts": [
+            {
+                "id": acc.id,
+                "name": acc.account_name,
+                "type": acc.account_type,
+                "balance": round(acc.balance, 2),
+                "currency": acc.currency
+            }
+            for acc in accounts
+        ]
+    }
+    
+    logger.info("Account summary generated for user %s", uid)
+    return summary
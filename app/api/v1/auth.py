@@ -1,75 +1,137 @@
-from datetime import datetime, timedelta
-from fastapi import APIRouter, Depends, HTTPException, status, Body
+from datetime import datetime
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status, Body
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
-from typing import Dict, Any
-from jose import jwt
-from pydantic import BaseModel
+from sqlalchemy import select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Dict, Any, Optional
+import logging
+import secrets
+import time
 
-from app.api.deps import get_db, oauth2_scheme
-from app.core.config import settings
+from app.api.deps import (
+    get_async_db,
+    get_cached_user,
+    invalidate_user_cache,
+    oauth2_scheme,
+)
+from app.core.database import AsyncSessionLocal
 from app.core.security import (
-    verify_password,
+    verify_and_update_password,
     get_password_hash,
     create_access_token,
     create_refresh_token,
+    consume_refresh_token,
+    decode_token,
+    register_refresh_token,
     verify_refresh_token
 )
 from app.models.user import User
 from app.schemas.user import UserCreate, User as UserSchema, Token, TokenData
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter()
 
+async def _issue_tokens(user_id: int, email: str) -> Dict[str, str]:
+    """
+    Create an access/refresh token pair, registering the refresh token
+    for single use.
+    """
+    data = {"sub": str(user_id), "email": email}
+    jti = secrets.token_urlsafe(16)
+    
+    access_token = create_access_token(data=data)
+    refresh_token = create_refresh_token(data={**data, "jti": jti})
+    await register_refresh_token(jti, user_id)
+    
+    return {
+        "access_token": access_token,
+        "refresh_token": refresh_token,
+        "token_type": "bearer"
+    }
+
 
-# Schema for refresh token request
-class RefreshTokenRequest(BaseModel):
-    refresh_token: str
+# Verified against when the email is unknown, so login takes the same
+# time whether or not the account exists
+_DUMMY_HASH = get_password_hash("dummy-password-for-timing")
+
+
+async def _record_login(
+    user_id: int, login_time: datetime, new_hash: Optional[str] = None
+) -> None:
+    """
+    Store a user's last login time, and an upgraded password hash if any.
+    Runs as a background task after the token response has been sent.
+    """
+    values = {"last_login": login_time}
+    if new_hash:
+        values["hashed_password"] = new_hash
+    
+    async with AsyncSessionLocal() as db:
+        await db.execute(update(User).where(User.id == user_id).values(**values))
+        await db.commit()
+    invalidate_user_cache(user_id)
 
 
 @router.post("/register", response_model=UserSchema, status_code=status.HTTP_201_CREATED)
-def register(user_in: UserCreate, db: Session = Depends(get_db)):
+async def register(user_in: UserCreate, db: AsyncSession = Depends(get_async_db)):
     """
     Register a new user.
     """
-    # Check if user already exists
-    existing_user = db.query(User).filter(User.email == user_in.email).first()
-    if existing_user:
+    # Hash off the event loop; password hashing is deliberately slow
+    hashed_password = await run_in_threadpool(get_password_hash, user_in.password)
+    
+    # Insert the user in one round-trip; the unique email index rejects
+    # duplicates, in which case nothing is returned
+    stmt = (
+        insert(User)
+        .values(
+            email=user_in.email,
+            full_name=user_in.full_name,
+            hashed_password=hashed_password,
+            preferred_currency=user_in.preferred_currency,
+            is_active=True,
+            is_superuser=False,
+            created_at=datetime.now()
+        )
+        .on_conflict_do_nothing(index_elements=[User.email])
+        .returning(User)
+    )
+    db_user = (await db.execute(stmt)).scalar_one_or_none()
+    if db_user is None:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered"
         )
     
-    # Create new user
-    db_user = User(
-        email=user_in.email,
-        full_name=user_in.full_name,
-        hashed_password=get_password_hash(user_in.password),
-        preferred_currency=user_in.preferred_currency,
-        is_active=True,
-        is_superuser=False,
-        created_at=datetime.now()
-    )
-    
-    db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
     
     return db_user
 
 
 @router.post("/login", response_model=Token)
-def login(
-    db: Session = Depends(get_db),
+async def login(
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_async_db),
     form_data: OAuth2PasswordRequestForm = Depends()
 ):
     """
     Login and get access token.
     """
     # Find user by email (username in form_data is email)
-    user = db.query(User).filter(User.email == form_data.username).first()
+    result = await db.execute(select(User).where(User.email == form_data.username))
+    user = result.scalar_one_or_none()
     
-    # Verify user exists and password is correct
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    # Always run one password check (off the event loop), even for
+    # unknown emails, so response time doesn't reveal which accounts exist
+    password_ok, new_hash = await run_in_threadpool(
+        verify_and_update_password,
+        form_data.password,
+        user.hashed_password if user else _DUMMY_HASH,
+    )
+    if user is None or not password_ok:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
@@ -83,46 +145,22 @@ def login(
             detail="Inactive user"
         )
     
-    # Update last login
-    user.last_login = datetime.now()
-    db.commit()
-    db.refresh(user)
+    # Record last login (and upgrade a legacy bcrypt hash) off the
+    # response path
+    background_tasks.add_task(_record_login, user.id, datetime.now(), new_hash)
     
-    # Create access token
-    access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    access_token = create_access_token(
-        data={"sub": str(user.id), "email": user.email},
-        expires_delta=access_token_expires
-    )
-    
-    # Create refresh token
-    refresh_token_expires = timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
-    refresh_token = create_refresh_token(
-        data={"sub": str(user.id), "email": user.email},
-        expires_delta=refresh_token_expires
-    )
-    
-    return {
-        "access_token": access_token,
-        "refresh_token": refresh_token,
-        "token_type": "bearer"
-    }
+    return await _issue_tokens(user.id, user.email)
 
 
 # FIXED: Proper refresh token endpoint that accepts JSON
 @router.post("/refresh", response_model=Token)
-def refresh_token(
-    request: RefreshTokenRequest,
-    db: Session = Depends(get_db)
-):
+async def refresh_token(refresh_token: str = Body(..., embed=True)):
     """
     Refresh access token using refresh token.
     
     Accepts JSON body with refresh_token field.
     """
     try:
-        refresh_token = request.refresh_token
-        
         if not refresh_token:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -145,8 +183,16 @@ def refresh_token(
                 detail="Invalid token payload"
             )
         
-        # Check if user exists and is active
-        user = db.query(User).filter(User.id == int(user_id)).first()
+        # Refresh tokens are single-use when rotation state is shared
+        if not await consume_refresh_token(payload):
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Refresh token has been used or revoked",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        
+        # Check if user exists and is active (cached like other auth lookups)
+        user = await get_cached_user(int(user_id))
         if not user:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -159,32 +205,17 @@ def refresh_token(
                 detail="Inactive user"
             )
         
-        # Create new access token
-        access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-        access_token = create_access_token(
-            data={"sub": str(user.id), "email": user.email},
-            expires_delta=access_token_expires
-        )
+        # Issue a new token pair (rotate refresh tokens for security)
+        tokens = await _issue_tokens(user.id, user.email)
         
-        # Create new refresh token (rotate refresh tokens for security)
-        refresh_token_expires = timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
-        new_refresh_token = create_refresh_token(
-            data={"sub": str(user.id), "email": user.email},
-            expires_delta=refresh_token_expires
-        )
+        logger.info("Token refresh for user %s", user.id)
         
-        print(f"✅ Token refresh successful for user {user.email}")
-        
-        return {
-            "access_token": access_token,
-            "refresh_token": new_refresh_token,
-            "token_type": "bearer"
-        }
+        return tokens
         
     except HTTPException:
         raise
     except Exception as e:
-        print(f"❌ Token refresh error: {str(e)}")
+        logger.exception("Token refresh failed")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Token refresh failed: {str(e)}"
@@ -198,20 +229,17 @@ def debug_token_info(token: str = Depends(oauth2_scheme)):
     Remove this in production!
     """
     try:
-        payload = jwt.decode(
-            token,
-            settings.SECRET_KEY,
-            algorithms=[settings.ALGORITHM]
-        )
+        payload = decode_token(token)
+        exp = payload.get("exp")
         return {
             "token_valid": True,
             "payload": payload,
             "user_id": payload.get("sub"),
             "email": payload.get("email"),
             "token_type": payload.get("type"),
-            "expires_at": payload.get("exp"),
-            "expires_at_readable": datetime.fromtimestamp(payload.get("exp")).isoformat() if payload.get("exp") else None,
-            "is_expired": payload.get("exp") < datetime.now().timestamp() if payload.get("exp") else None,
+            "expires_at": exp,
+            "expires_at_readable": datetime.fromtimestamp(exp).isoformat() if exp else None,
+            "is_expired": exp < time.time() if exp else None,
         }
     except Exception as e:
         return {
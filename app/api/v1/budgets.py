@@ -1,11 +1,11 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import case, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 from datetime import datetime, timedelta
 from dateutil.relativedelta import relativedelta
 
-from app.api.deps import get_db, get_current_active_user
+from app.api.deps import get_async_db, get_current_active_user
 from app.models.user import User
 from app.models.budget import Budget, BudgetPeriod
 from app.models.transaction import Transaction
@@ -15,20 +15,23 @@ router = APIRouter()
 
 
 @router.post("/", response_model=BudgetSchema, status_code=status.HTTP_201_CREATED)
-def create_budget(
+async def create_budget(
     budget_in: BudgetCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """
     Create a new budget for a category.
     """
     # Check if budget already exists for this category and period
-    existing = db.query(Budget).filter(
-        Budget.user_id == current_user.id,
-        Budget.category == budget_in.category,
-        Budget.period == budget_in.period
-    ).first()
+    result = await db.execute(
+        select(Budget.id).where(
+            Budget.user_id == current_user.id,
+            Budget.category == budget_in.category,
+            Budget.period == budget_in.period
+        )
+    )
+    existing = result.first()
     
     if existing:
         raise HTTPException(
@@ -41,56 +44,75 @@ def create_budget(
         user_id=current_user.id
     )
     db.add(db_budget)
-    db.commit()
-    db.refresh(db_budget)
+    await db.commit()
     return db_budget
 
 
 @router.get("/", response_model=List[BudgetSchema])
-def list_budgets(
-    db: Session = Depends(get_db),
+async def list_budgets(
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """
     Get all budgets for the current user.
     """
-    budgets = db.query(Budget).filter(
-        Budget.user_id == current_user.id
-    ).all()
-    return budgets
+    result = await db.execute(
+        select(Budget).where(Budget.user_id == current_user.id)
+    )
+    return result.scalars().all()
 
 
 @router.get("/status", response_model=List[BudgetStatus])
-def get_budget_status(
-    db: Session = Depends(get_db),
+async def get_budget_status(
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """
     Get budget status with current spending for each budget.
     """
-    budgets = db.query(Budget).filter(
-        Budget.user_id == current_user.id
-    ).all()
+    result = await db.execute(
+        select(Budget).where(Budget.user_id == current_user.id)
+    )
+    budgets = result.scalars().all()
     
-    status_list = []
+    if not budgets:
+        return []
+    
+    # Start of the current window for each budget period
     now = datetime.now()
+    start_dates = {
+        BudgetPeriod.WEEKLY: (now - timedelta(days=7)).date(),
+        BudgetPeriod.MONTHLY: (now - relativedelta(months=1)).date(),
+        BudgetPeriod.YEARLY: (now - relativedelta(years=1)).date(),
+    }
+    periods = list(start_dates)
     
-    for budget in budgets:
-        # Calculate date range based on period
-        if budget.period == BudgetPeriod.WEEKLY:
-            start_date = (now - timedelta(days=7)).date()
-        elif budget.period == BudgetPeriod.MONTHLY:
-            start_date = (now - relativedelta(months=1)).date()
-        else:  # YEARLY
-            start_date = (now - relativedelta(years=1)).date()
-        
-        # Calculate spent amount
-        spent = db.query(func.sum(Transaction.amount)).filter(
+    # Spending per category for every period window in a single query
+    result = await db.execute(
+        select(
+            Transaction.category,
+            *(
+                func.sum(case(
+                    (Transaction.transaction_date >= start_dates[period], Transaction.amount)
+                ))
+                for period in periods
+            )
+        ).where(
             Transaction.user_id == current_user.id,
-            Transaction.category == budget.category,
+            Transaction.category.in_({budget.category for budget in budgets}),
             Transaction.transaction_type == "expense",
-            Transaction.transaction_date >= start_date
-        ).scalar() or 0.0
+            Transaction.transaction_date >= min(start_dates.values())
+        ).group_by(Transaction.category)
+    )
+    rows = result.all()
+    spent_by_category = {row[0]: dict(zip(periods, row[1:])) for row in rows}
+    
+    status_list = []
+    
+    for budget in budgets:
+        # Pick the window matching the budget's period (yearly by default)
+        period = budget.period if budget.period in start_dates else BudgetPeriod.YEARLY
+        spent = spent_by_category.get(budget.category, {}).get(period) or 0.0
         
         remaining = budget.limit_amount - spent
         percentage_used = (spent / budget.limit_amount * 100) if budget.limit_amount > 0 else 0
@@ -108,20 +130,17 @@ def get_budget_status(
 
 
 @router.get("/{budget_id}", response_model=BudgetSchema)
-def get_budget(
+async def get_budget(
     budget_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """
     Get a specific budget by ID.
     """
-    budget = db.query(Budget).filter(
-        Budget.id == budget_id,
-        Budget.user_id == current_user.id
-    ).first()
+    budget = await db.get(Budget, budget_id)
     
-    if not budget:
+    if budget is None or budget.user_id != current_user.id:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Budget not found"
@@ -131,21 +150,18 @@ def get_budget(
 
 
 @router.put("/{budget_id}", response_model=BudgetSchema)
-def update_budget(
+async def update_budget(
     budget_id: int,
     budget_in: BudgetUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """
     Update a budget.
     """
-    budget = db.query(Budget).filter(
-        Budget.id == budget_id,
-        Budget.user_id == current_user.id
-    ).first()
+    budget = await db.get(Budget, budget_id)
     
-    if not budget:
+    if budget is None or budget.user_id != current_user.id:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Budget not found"
@@ -155,32 +171,28 @@ def update_budget(
     for field, value in update_data.items():
         setattr(budget, field, value)
     
-    db.commit()
-    db.refresh(budget)
+    await db.commit()
     return budget
 
 
 @router.delete("/{budget_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_budget(
+async def delete_budget(
     budget_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """
     Delete a budget.
     """
-    budget = db.query(Budget).filter(
-        Budget.id == budget_id,
-        Budget.user_id == current_user.id
-    ).first()
+    budget = await db.get(Budget, budget_id)
     
-    if not budget:
+    if budget is None or budget.user_id != current_user.id:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Budget not found"
         )
     
-    db.delete(budget)
-    db.commit()
+    await db.delete(budget)
+    await db.commit()
     
     return None
\ No newline at end of file
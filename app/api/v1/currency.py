@@ -1,6 +1,8 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from typing import List, Dict, Any
 from datetime import date
+import hashlib
+import re
 
 from app.api.deps import get_current_active_user
 from app.models.user import User
@@ -8,9 +10,33 @@ from app.services.currency import currency_service
 
 router = APIRouter()
 
+# Currencies returned by /popular
+POPULAR_CURRENCIES = ("EUR", "GBP", "JPY", "CNY", "CAD", "AUD", "INR")
+
+# Limit and separator for /convert-multiple targets
+MAX_TARGET_CURRENCIES = 10
+_CURRENCY_SEPARATOR = re.compile(r"\s*,\s*")
+
+
+def _rates_etag(request: Request, response: Response, kind: str, base: str, rates_date: str):
+    """
+    Tag a rates response with an ETag derived from the publication date.
+    
+    Rates only change when a new date is published, so the tag identifies
+    the body. Returns a 304 response if the client already has it,
+    otherwise None.
+    """
+    etag = '"%s"' % hashlib.sha1(f"{kind}:{base.upper()}:{rates_date}".encode()).hexdigest()
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    return None
+
 
 @router.get("/rates")
 async def get_exchange_rates(
+    request: Request,
+    response: Response,
     base: str = Query("USD", description="Base currency code (e.g., USD, EUR, GBP)"),
     current_user: User = Depends(get_current_active_user)
 ) -> Dict[str, Any]:
@@ -35,6 +61,9 @@ async def get_exchange_rates(
             },
             "source": "Frankfurter API (European Central Bank)"
         }
+        
+    Responses carry an ETag; send it back in If-None-Match to get a 304
+    while the rates are unchanged.
     """
     result = await currency_service.get_exchange_rates(base)
     
@@ -44,6 +73,10 @@ async def get_exchange_rates(
             detail=result.get("message", "Error fetching rates")
         )
     
+    not_modified = _rates_etag(request, response, "rates", base, result.get("date"))
+    if not_modified is not None:
+        return not_modified
+    
     return result
 
 
@@ -106,13 +139,14 @@ async def convert_multiple_currencies(
             "date": "2026-01-20"
         }
     """
-    # Parse comma-separated currencies
-    currencies_list = [c.strip() for c in to_currencies.split(",")]
+    # Parse comma-separated currencies (unknown codes are rejected by the
+    # service from cached rates, before any extra request)
+    currencies_list = _CURRENCY_SEPARATOR.split(to_currencies.strip())
     
-    if len(currencies_list) > 10:
+    if len(currencies_list) > MAX_TARGET_CURRENCIES:
         raise HTTPException(
             status_code=400,
-            detail="Maximum 10 currencies allowed per request"
+            detail=f"Maximum {MAX_TARGET_CURRENCIES} currencies allowed per request"
         )
     
     result = await currency_service.convert_multiple(amount, from_currency, currencies_list)
@@ -195,6 +229,8 @@ async def get_supported_currencies(
 
 @router.get("/popular")
 async def get_popular_currencies(
+    request: Request,
+    response: Response,
     base: str = Query("USD", description="Base currency"),
     current_user: User = Depends(get_current_active_user)
 ) -> Dict[str, Any]:
@@ -206,9 +242,7 @@ async def get_popular_currencies(
     Example:
         GET /api/v1/currency/popular?base=USD
     """
-    popular_currencies = ["EUR", "GBP", "JPY", "CNY", "CAD", "AUD", "INR"]
-    
-    result = await currency_service.convert_multiple(1, base, popular_currencies)
+    result = await currency_service.convert_multiple(1, base, POPULAR_CURRENCIES)
     
     if "error" in result:
         raise HTTPException(
@@ -216,6 +250,10 @@ async def get_popular_currencies(
             detail="Error fetching popular currencies"
         )
     
+    not_modified = _rates_etag(request, response, "popular", base, result.get("date"))
+    if not_modified is not None:
+        return not_modified
+    
     # Format for easier display
     formatted = {
         "base": base,
@@ -1,17 +1,87 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from fastapi.responses import ORJSONResponse
 from typing import Dict, Any
+import hashlib
+import orjson
+import re
 
-from app.api.deps import get_current_active_user
-from app.models.user import User
+from app.api.deps import CurrentUser, rate_limit
+from app.core.config import settings
 from app.services.market_data import market_service
 
-router = APIRouter()
+# orjson is much faster than json for the nested, float-heavy payloads here.
+# Requests are limited per user and symbol so one client cannot exhaust the
+# upstream quota.
+router = APIRouter(
+    default_response_class=ORJSONResponse,
+    dependencies=[
+        Depends(
+            rate_limit("market", settings.MARKET_RATE_LIMIT, settings.MARKET_RATE_LIMIT_PERIOD)
+        )
+    ],
+)
+
+# Valid symbols, checked before any upstream call: stock tickers (after
+# upper-casing) and crypto symbols/CoinGecko IDs (after lower-casing)
+STOCK_SYMBOL_RE = re.compile(r"[A-Z0-9.\-]{1,10}")
+CRYPTO_SYMBOL_RE = re.compile(r"[a-z0-9\-]{1,20}")
+
+# Fallback payloads returned when upstream data is unavailable. Shared
+# between requests, so never mutate them; per-request fields are merged
+# into a new dict.
+STOCK_FALLBACK = {
+    "price": 100.00,
+    "change": 0.00,
+    "change_percent": 0.00,
+    "volume": 0,
+    "last_updated": "N/A",
+    "source": "fallback",
+}
+
+CRYPTO_FALLBACK = {
+    "price": 1000.00,
+    "change_24h": 0.00,
+    "volume_24h": 0,
+    "market_cap": 0,
+    "last_updated": "N/A",
+    "source": "fallback",
+}
+
+OVERVIEW_FALLBACK = {
+    "stocks": [
+        {"symbol": "AAPL", "price": 182.63, "change": 1.24, "change_percent": 0.68, "name": "Apple Inc."},
+        {"symbol": "GOOGL", "price": 145.85, "change": -0.42, "change_percent": -0.29, "name": "Alphabet Inc."},
+        {"symbol": "MSFT", "price": 406.32, "change": 2.15, "change_percent": 0.53, "name": "Microsoft Corp."},
+    ],
+    "cryptocurrencies": [
+        {"symbol": "BTC", "price": 61423.50, "change_24h": 1250.25, "name": "Bitcoin"},
+        {"symbol": "ETH", "price": 3421.75, "change_24h": 45.30, "name": "Ethereum"},
+        {"symbol": "SOL", "price": 142.60, "change_24h": 8.45, "name": "Solana"},
+    ],
+    "timestamp": "2024-01-01T00:00:00Z",
+    "source": "fallback",
+}
+
+# The overview fallback never varies, so its response body is serialized once
+_OVERVIEW_FALLBACK_BODY = orjson.dumps({**OVERVIEW_FALLBACK, "message": "Using fallback market data"})
+
+
+def _revalidated_json(request: Request, body: bytes) -> Response:
+    """
+    Return a JSON body tagged with an ETag, or an empty 304 if the client's
+    If-None-Match already matches it.
+    """
+    etag = '"%s"' % hashlib.blake2b(body, digest_size=8).hexdigest()
+    headers = {"ETag": etag, "Cache-Control": "private, max-age=5"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
 
 
 @router.get("/stocks/{symbol}")
 async def get_stock(
     symbol: str,
-    current_user: User = Depends(get_current_active_user)
+    current_user: CurrentUser
 ) -> Dict[str, Any]:
     """
     Get current stock price and information.
@@ -23,44 +93,28 @@ async def get_stock(
     Returns:
         Stock price and details
     """
-    if not symbol or len(symbol) > 10:
+    symbol = symbol.upper()
+    if not STOCK_SYMBOL_RE.fullmatch(symbol):
         raise HTTPException(status_code=400, detail="Invalid stock symbol")
     
-    try:
-        result = await market_service.get_stock_price(symbol)
-        
-        if "error" in result:
-            # Return fallback data instead of raising error
-            return {
-                "symbol": symbol.upper(),
-                "price": 100.00,
-                "change": 0.00,
-                "change_percent": 0.00,
-                "volume": 0,
-                "last_updated": "N/A",
-                "source": "fallback",
-                "message": "Using fallback stock data"
-            }
-        
-        return result
-    except Exception as e:
-        # Return fallback data on any error
+    # The service reports failures as an "error" key rather than raising
+    result = await market_service.get_stock_price(symbol)
+    
+    if "error" in result:
+        # Return fallback data instead of raising error
         return {
-            "symbol": symbol.upper(),
-            "price": 100.00,
-            "change": 0.00,
-            "change_percent": 0.00,
-            "volume": 0,
-            "last_updated": "N/A",
-            "source": "fallback",
-            "message": f"Error fetching stock data: {str(e)}"
+            "symbol": symbol,
+            **STOCK_FALLBACK,
+            "message": "Using fallback stock data"
         }
+    
+    return result
 
 
 @router.get("/crypto/{symbol}")
 async def get_crypto(
     symbol: str,
-    current_user: User = Depends(get_current_active_user)
+    current_user: CurrentUser
 ) -> Dict[str, Any]:
     """
     Get current cryptocurrency price and information.
@@ -72,91 +126,48 @@ async def get_crypto(
     Returns:
         Cryptocurrency price and details
     """
-    if not symbol or len(symbol) > 20:
+    symbol = symbol.lower()
+    if not CRYPTO_SYMBOL_RE.fullmatch(symbol):
         raise HTTPException(status_code=400, detail="Invalid crypto symbol")
     
-    try:
-        result = await market_service.get_crypto_price(symbol)
-        
-        if "error" in result:
-            # Return fallback data
-            return {
-                "symbol": symbol.upper(),
-                "name": symbol.title(),
-                "price": 1000.00,
-                "change_24h": 0.00,
-                "volume_24h": 0,
-                "market_cap": 0,
-                "last_updated": "N/A",
-                "source": "fallback",
-                "message": "Using fallback crypto data"
-            }
-        
-        return result
-    except Exception as e:
-        # Return fallback data on any error
+    result = await market_service.get_crypto_price(symbol)
+    
+    if "error" in result:
+        # Return fallback data
         return {
             "symbol": symbol.upper(),
             "name": symbol.title(),
-            "price": 1000.00,
-            "change_24h": 0.00,
-            "volume_24h": 0,
-            "market_cap": 0,
-            "last_updated": "N/A",
-            "source": "fallback",
-            "message": f"Error fetching crypto data: {str(e)}"
+            **CRYPTO_FALLBACK,
+            "message": "Using fallback crypto data"
         }
+    
+    return result
 
 
 @router.get("/overview")
 async def get_market_overview(
-    current_user: User = Depends(get_current_active_user)
+    request: Request,
+    current_user: CurrentUser
 ) -> Dict[str, Any]:
     """
     Get overview of major market indices and cryptocurrencies.
     
+    The overview only changes when its cache refreshes, so responses carry
+    an ETag; pollers sending it back in If-None-Match get an empty 304.
+    
     Args:
+        request: Incoming request (for If-None-Match)
         current_user: Current authenticated user
         
     Returns:
         Market overview with stocks and crypto data
     """
-    try:
-        result = await market_service.get_market_overview()
-        
-        if "error" in result:
-            # Return fallback data
-            return {
-                "stocks": [
-                    {"symbol": "AAPL", "price": 182.63, "change": 1.24, "change_percent": 0.68, "name": "Apple Inc."},
-                    {"symbol": "GOOGL", "price": 145.85, "change": -0.42, "change_percent": -0.29, "name": "Alphabet Inc."},
-                    {"symbol": "MSFT", "price": 406.32, "change": 2.15, "change_percent": 0.53, "name": "Microsoft Corp."},
-                ],
-                "cryptocurrencies": [
-                    {"symbol": "BTC", "price": 61423.50, "change_24h": 1250.25, "name": "Bitcoin"},
-                    {"symbol": "ETH", "price": 3421.75, "change_24h": 45.30, "name": "Ethereum"},
-                    {"symbol": "SOL", "price": 142.60, "change_24h": 8.45, "name": "Solana"},
-                ],
-                "timestamp": "2024-01-01T00:00:00Z",
-                "source": "fallback",
-                "message": "Using fallback market data"
-            }
-        
-        return result
-    except Exception as e:
-        # Return fallback data on any error
-        return {
-            "stocks": [
-                {"symbol": "AAPL", "price": 182.63, "change": 1.24, "change_percent": 0.68, "name": "Apple Inc."},
-                {"symbol": "GOOGL", "price": 145.85, "change": -0.42, "change_percent": -0.29, "name": "Alphabet Inc."},
-                {"symbol": "MSFT", "price": 406.32, "change": 2.15, "change_percent": 0.53, "name": "Microsoft Corp."},
-            ],
-            "cryptocurrencies": [
-                {"symbol": "BTC", "price": 61423.50, "change_24h": 1250.25, "name": "Bitcoin"},
-                {"symbol": "ETH", "price": 3421.75, "change_24h": 45.30, "name": "Ethereum"},
-                {"symbol": "SOL", "price": 142.60, "change_24h": 8.45, "name": "Solana"},
-            ],
-            "timestamp": "2024-01-01T00:00:00Z",
-            "source": "fallback",
-            "message": f"Error fetching market data: {str(e)}"
-        }
\ No newline at end of file
+    result = await market_service.get_market_overview()
+    
+    if "error" in result:
+        # Return fallback data
+        body = _OVERVIEW_FALLBACK_BODY
+    else:
+        body = orjson.dumps(result)
+    
+    return _revalidated_json(request, body)
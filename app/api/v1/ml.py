@@ -1,11 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List, Dict, Any
-
-from app.api.deps import get_db, get_current_active_user
-from app.models.user import User
-from app.ml_models.categorizer import categorizer
-from app.ml_models.predictor import predictor
+from fastapi import APIRouter, HTTPException, status
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from fastapi.concurrency import run_in_threadpool
+from typing import AsyncIterator, List, Dict, Any, Tuple
+import orjson
+
+from app.api.deps import AsyncDBSession, CurrentUser
+from app.ml_models.categorizer import batcher, categorizer
+from app.ml_models.predictor import MAX_TREND_MONTHS, predictor
 from app.schemas.prediction import (
     PredictionRequest,
     PredictionResponse,
@@ -13,12 +14,70 @@ from app.schemas.prediction import (
     SpendingTrend,
 )
 
-router = APIRouter()
+# orjson is much faster than json for the nested, float-heavy payloads here
+router = APIRouter(default_response_class=ORJSONResponse)
+
+
+def _model_info(loaded: bool) -> Dict[str, Any]:
+    """Build the /model-info payload for a categorizer load state."""
+    return {
+        "categorizer": {
+            "type": "TF-IDF + Naive Bayes",
+            "categories": categorizer.categories,
+            "status": "loaded" if loaded else "not loaded",
+        },
+        "predictor": {
+            "type": "Statistical Prediction",
+            "min_transactions": predictor.min_transactions,
+            "status": "active",
+        },
+    }
+
+
+# Static responses, built once. /model-info only varies with whether the
+# categorizer model is loaded, so both variants are prebuilt.
+CATEGORIES = categorizer.categories
+MODEL_INFO = {loaded: _model_info(loaded) for loaded in (False, True)}
+
+# /categorize-batch predicts and streams its results in chunks of this size
+BATCH_STREAM_CHUNK_SIZE = 16
+
+
+async def _stream_predictions(
+    chunks: List[List[str]], first: List[Tuple[str, float]]
+) -> AsyncIterator[bytes]:
+    """
+    Yield a JSON array of predictions, predicting one chunk at a time so
+    the client receives the first results before the whole batch is done.
+
+    Args:
+        chunks: Descriptions split into chunks
+        first: Predictions already made for the first chunk
+    """
+    yield b"["
+    predictions = first
+    for index, chunk in enumerate(chunks):
+        if index:
+            predictions = await run_in_threadpool(categorizer.predict_batch, chunk)
+            yield b","
+        # One dumps call per chunk; the array brackets are stripped so
+        # chunks join into a single array
+        yield orjson.dumps(
+            [
+                {
+                    "description": desc,
+                    "category": category,
+                    "confidence": round(float(confidence), 3),
+                }
+                for desc, (category, confidence) in zip(chunk, predictions)
+            ]
+        )[1:-1]
+    yield b"]"
 
 
 @router.post("/categorize")
-def categorize_expense(
-    description: str, current_user: User = Depends(get_current_active_user)
+async def categorize_expense(
+    description: str, current_user: CurrentUser
 ) -> Dict[str, Any]:
     """
     Categorize an expense based on its description using ML.
@@ -47,7 +106,8 @@ def categorize_expense(
         )
 
     try:
-        category, confidence = categorizer.predict(description)
+        # Batched with concurrent requests and run off the event loop
+        category, confidence = await batcher.submit(description)
 
         return {
             "category": category,
@@ -62,8 +122,8 @@ def categorize_expense(
 
 
 @router.post("/categorize-batch")
-def categorize_batch(
-    descriptions: List[str], current_user: User = Depends(get_current_active_user)
+async def categorize_batch(
+    descriptions: List[str], current_user: CurrentUser
 ) -> List[Dict[str, Any]]:
     """
     Categorize multiple expenses at once.
@@ -87,29 +147,27 @@ def categorize_batch(
             detail="Maximum 100 descriptions allowed per request",
         )
 
-    try:
-        predictions = categorizer.predict_batch(descriptions)
-
-        results = []
-        for desc, (category, confidence) in zip(descriptions, predictions):
-            results.append(
-                {
-                    "description": desc,
-                    "category": category,
-                    "confidence": round(confidence, 3),
-                }
-            )
+    chunks = [
+        descriptions[i : i + BATCH_STREAM_CHUNK_SIZE]
+        for i in range(0, len(descriptions), BATCH_STREAM_CHUNK_SIZE)
+    ]
 
-        return results
+    # The first chunk is predicted up front so model errors still return a 500
+    try:
+        first = await run_in_threadpool(categorizer.predict_batch, chunks[0])
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error in batch categorization: {str(e)}",
         )
 
+    return StreamingResponse(
+        _stream_predictions(chunks, first), media_type="application/json"
+    )
+
 
 @router.get("/categories")
-def get_categories(current_user: User = Depends(get_current_active_user)) -> List[str]:
+async def get_categories(current_user: CurrentUser) -> List[str]:
     """
     Get list of all available expense categories.
 
@@ -119,21 +177,19 @@ def get_categories(current_user: User = Depends(get_current_active_user)) -> Lis
     Returns:
         List of category names
     """
-    return categorizer.get_categories()
+    return CATEGORIES
 
 
 @router.post("/predict-expenses", response_model=PredictionResponse)
-def predict_expenses(
+async def predict_expenses(
     request: PredictionRequest,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user),
+    current_user: CurrentUser,
 ):
     """
     Predict future expenses based on historical data.
 
     Args:
         request: Prediction request with months_ahead parameter
-        db: Database session
         current_user: Current authenticated user
 
     Returns:
@@ -158,8 +214,8 @@ def predict_expenses(
         }
     """
     try:
-        result = predictor.predict_next_month(
-            db=db, user_id=int(current_user.id), months_ahead=request.months_ahead
+        result = await predictor.predict_next_month(
+            user_id=int(current_user.id), months_ahead=request.months_ahead
         )
 
         return result
@@ -171,17 +227,15 @@ def predict_expenses(
 
 
 @router.get("/predict-expenses", response_model=PredictionResponse)
-def predict_expenses_get(
+async def predict_expenses_get(
+    current_user: CurrentUser,
     months_ahead: int = 1,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user),
 ):
     """
     Predict future expenses based on historical data (GET version).
 
     Args:
         months_ahead: Number of months ahead to predict (default: 1)
-        db: Database session
         current_user: Current authenticated user
 
     Returns:
@@ -191,8 +245,8 @@ def predict_expenses_get(
         # Create a PredictionRequest object for compatibility
         request = PredictionRequest(months_ahead=months_ahead, categories=None)
 
-        result = predictor.predict_next_month(
-            db=db, user_id=int(current_user.id), months_ahead=request.months_ahead
+        result = await predictor.predict_next_month(
+            user_id=int(current_user.id), months_ahead=request.months_ahead
         )
 
         return result
@@ -204,10 +258,10 @@ def predict_expenses_get(
 
 
 @router.get("/spending-trends", response_model=List[SpendingTrend])
-def get_spending_trends(
+async def get_spending_trends(
+    db: AsyncDBSession,
+    current_user: CurrentUser,
     months: int = 6,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user),
 ):
     """
     Get spending trends and patterns over time.
@@ -234,14 +288,14 @@ def get_spending_trends(
             }
         ]
     """
-    if months < 1 or months > 24:
+    if months < 1 or months > MAX_TREND_MONTHS:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Months parameter must be between 1 and 24",
+            detail=f"Months parameter must be between 1 and {MAX_TREND_MONTHS}",
         )
 
     try:
-        trends = predictor.get_spending_trends(
+        trends = await predictor.get_cached_spending_trends(
             db=db, user_id=int(current_user.id), months=months
         )
 
@@ -254,8 +308,8 @@ def get_spending_trends(
 
 
 @router.get("/model-info")
-def get_model_info(
-    current_user: User = Depends(get_current_active_user),
+async def get_model_info(
+    current_user: CurrentUser,
 ) -> Dict[str, Any]:
     """
     Get information about the ML models.
@@ -266,15 +320,18 @@ def get_model_info(
     Returns:
         Model information and statistics
     """
-    return {
-        "categorizer": {
-            "type": "TF-IDF + Naive Bayes",
-            "categories": categorizer.get_categories(),
-            "status": "loaded" if categorizer.pipeline is not None else "not loaded",
-        },
-        "predictor": {
-            "type": "Statistical Prediction",
-            "min_transactions": predictor.min_transactions,
-            "status": "active",
-        },
-    }
+    return MODEL_INFO[categorizer.pipeline is not None]
+
+
+@router.get("/cache-info")
+async def get_cache_info(current_user: CurrentUser) -> Dict[str, Any]:
+    """
+    Get hit/miss statistics of the categorizer's prediction cache.
+
+    Args:
+        current_user: Current authenticated user
+
+    Returns:
+        Cache hits, misses, maximum size and current size
+    """
+    return categorizer.cache_info()._asdict()
@@ -3,17 +3,30 @@ Transactions API Router
 Handles all transaction-related operations including CRUD, filtering, and ML categorization.
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Response, status, Query
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import Date, Integer, bindparam, case, func, select, tuple_, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import SQLAlchemyError, IntegrityError
-from typing import List, Optional, Dict, Any
+from pydantic import TypeAdapter
+from typing import List, Optional, Dict, Any, Tuple
 from datetime import date, datetime
+from functools import lru_cache
+import asyncio
+import base64
+import json
 import logging
+import time
 
-from app.api.deps import get_db, get_current_active_user
+from app.api.deps import get_async_db, get_current_active_user
+from app.core.database import estimated_count
+from app.core.store import store
 from app.models.user import User
 from app.models.transaction import Transaction
 from app.models.account import Account
+from app.ml_models.categorizer import categorizer
+from app.ml_models.merchant_rules import match_merchant
+from app.ml_models.predictor import predictor
 from app.schemas.transaction import (
     TransactionCreate, 
     TransactionUpdate, 
@@ -26,11 +39,146 @@ logger = logging.getLogger(__name__)
 # Initialize router
 router = APIRouter()
 
+# Validates ORM rows and serializes the list in one pydantic-core pass,
+# skipping FastAPI's per-row jsonable_encoder
+_transaction_list = TypeAdapter(List[TransactionSchema])
+
+# Columns serialized by TransactionSchema; read endpoints select these as
+# plain rows instead of hydrating ORM instances
+TRANSACTION_COLUMNS = tuple(
+    getattr(Transaction, field) for field in TransactionSchema.model_fields
+)
+
+SUMMARY_CACHE_TTL = 300  # Seconds; writes invalidate sooner
+# Must outlive SUMMARY_CACHE_TTL so no summary outlives its version
+SUMMARY_VERSION_TTL = 86400
+
+
+async def _summary_key(user_id: int, start_date: Optional[date], end_date: Optional[date]) -> str:
+    """
+    Cache key for a user's summary over a date window. Keys embed the
+    user's summary version, so a write invalidates every window at once.
+    """
+    version = await store.get(f"sumver:{user_id}") or "0"
+    return f"sum:{user_id}:{version}:{start_date}:{end_date}"
+
+
+async def _invalidate_derived(user_id: int) -> None:
+    """Drop cached aggregates derived from a user's transactions."""
+    await asyncio.gather(
+        store.set(f"sumver:{user_id}", str(time.time_ns()), ttl=SUMMARY_VERSION_TTL),
+        predictor.invalidate_spending_trends(user_id),
+    )
+
+
+def _balance_effect(transaction_type: str, amount: float) -> float:
+    """Signed change a transaction makes to its account balance."""
+    return amount if transaction_type == "income" else -amount
+
+
+async def _adjust_balance(db: AsyncSession, account_id: int, user_id: int, delta: float) -> bool:
+    """
+    Add delta to an account balance in a single UPDATE, so concurrent
+    transactions on the same account cannot lose each other's changes.
+    
+    Returns:
+        bool: False if the account does not exist or belongs to another user
+    """
+    result = await db.execute(
+        update(Account)
+        .where(Account.id == account_id, Account.user_id == user_id)
+        .values(balance=Account.balance + delta)
+    )
+    return result.rowcount > 0
+
+
+# Optional list filters by query parameter, with the value bound at execution
+_LIST_FILTERS = {
+    "category": Transaction.category == bindparam("category"),
+    "transaction_type": Transaction.transaction_type == bindparam("transaction_type"),
+    "start_date": Transaction.transaction_date >= bindparam("start_date"),
+    "end_date": Transaction.transaction_date <= bindparam("end_date"),
+    "account_id": Transaction.account_id == bindparam("account_id"),
+}
+
+
+@lru_cache(maxsize=None)
+def _list_statement(filters: Tuple[str, ...], after_cursor: bool, paginated: bool):
+    """
+    Parameterized SELECT for list_transactions. The statement only depends
+    on which filters are present, so each of the few combinations is built
+    once and later requests just bind their values.
+    
+    Args:
+        filters: Names of the _LIST_FILTERS in use
+        after_cursor: Whether to continue after a (cursor_date, cursor_id) position
+        paginated: Whether to add ordering and limit, plus skip when not
+            continuing after a cursor
+    """
+    stmt = select(*TRANSACTION_COLUMNS).where(
+        Transaction.user_id == bindparam("user_id"),
+        *(_LIST_FILTERS[name] for name in filters)
+    )
+    if after_cursor:
+        stmt = stmt.where(
+            tuple_(Transaction.transaction_date, Transaction.id)
+            < tuple_(bindparam("cursor_date", type_=Date), bindparam("cursor_id", type_=Integer))
+        )
+    if paginated:
+        # Date descending, id breaks ties
+        stmt = stmt.order_by(
+            Transaction.transaction_date.desc(),
+            Transaction.id.desc()
+        ).limit(bindparam("limit"))
+        if not after_cursor:
+            stmt = stmt.offset(bindparam("skip"))
+    return stmt
+
+
+async def _predict_category(description: str) -> Optional[Tuple[str, float]]:
+    """
+    Categorize a description with the ML model in the threadpool.
+    
+    Returns:
+        (category, confidence), or None if the model failed
+    """
+    try:
+        category, confidence = await run_in_threadpool(categorizer.predict, description)
+    except Exception as e:
+        logger.warning(f"ML categorization failed: {str(e)}, using default")
+        return None
+    logger.info(f"Auto-categorized as '{category}' with confidence {confidence:.2f}")
+    return category, confidence
+
+
+def _encode_cursor(transaction) -> str:
+    """Encode the (transaction_date, id) position of a row as an opaque cursor."""
+    raw = f"{transaction.transaction_date.isoformat()}_{transaction.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> tuple:
+    """
+    Decode a cursor produced by _encode_cursor.
+    
+    Raises:
+        HTTPException: If the cursor is malformed
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+        day, txn_id = raw.split("_")
+        return date.fromisoformat(day), int(txn_id)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor"
+        )
+
 
 @router.post("/", response_model=TransactionSchema, status_code=status.HTTP_201_CREATED)
-def create_transaction(
+async def create_transaction(
     transaction_in: TransactionCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """
@@ -53,39 +201,48 @@ def create_transaction(
     try:
         logger.info(f"User {current_user.id} creating transaction for account {transaction_in.account_id}")
         
-        # Verify account belongs to user
-        account = db.query(Account).filter(
-            Account.id == transaction_in.account_id,
-            Account.user_id == current_user.id
-        ).first()
-        
-        if not account:
-            logger.warning(f"Account {transaction_in.account_id} not found for user {current_user.id}")
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Account with ID {transaction_in.account_id} not found"
-            )
-        
         # Auto-categorize if no category provided
         auto_categorized = 0
         category_confidence = None
+        prediction = None
         
         if not transaction_in.category and transaction_in.description:
-            try:
-                from app.ml_models.categorizer import categorizer
-                # Use ML to categorize
-                category, confidence = categorizer.predict(transaction_in.description)
-                transaction_in.category = category
+            # Known merchants are matched by keyword, without the model
+            rule_category = match_merchant(transaction_in.description)
+            if rule_category:
+                transaction_in.category = rule_category
                 auto_categorized = 1
-                category_confidence = confidence
-                logger.info(f"Auto-categorized as '{category}' with confidence {confidence:.2f}")
-            except Exception as e:
-                logger.warning(f"ML categorization failed: {str(e)}, using default")
-                transaction_in.category = "Other"
+                category_confidence = 1.0
+                logger.info(f"Categorized as '{rule_category}' by merchant rule")
+            else:
+                prediction = _predict_category(transaction_in.description)
         elif not transaction_in.category:
             # Default category if no description
             transaction_in.category = "Other"
         
+        # Update the balance, which also verifies the account belongs to the
+        # user; the model (if needed) runs in a thread meanwhile
+        delta = _balance_effect(transaction_in.transaction_type, transaction_in.amount)
+        adjust = _adjust_balance(db, transaction_in.account_id, current_user.id, delta)
+        if prediction is not None:
+            found, predicted = await asyncio.gather(adjust, prediction)
+        else:
+            found, predicted = await adjust, None
+        
+        if not found:
+            logger.warning(f"Account {transaction_in.account_id} not found for user {current_user.id}")
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Account with ID {transaction_in.account_id} not found"
+            )
+        
+        if prediction is not None:
+            if predicted is None:
+                transaction_in.category = "Other"
+            else:
+                transaction_in.category, category_confidence = predicted
+                auto_categorized = 1
+        
         # Create transaction
         db_transaction = Transaction(
             **transaction_in.dict(),
@@ -94,42 +251,36 @@ def create_transaction(
             category_confidence=category_confidence
         )
         
-        # Update account balance
-        old_balance = account.balance
-        if transaction_in.transaction_type == "income":
-            account.balance += transaction_in.amount
-        else:  # expense
-            account.balance -= transaction_in.amount
-        
-        logger.info(f"Account {account.id} balance: {old_balance} -> {account.balance}")
+        logger.info(f"Account {transaction_in.account_id} balance adjusted by {delta}")
         
         # Add and commit
         db.add(db_transaction)
-        db.commit()
-        db.refresh(db_transaction)
+        await db.commit()
+        # Reload server-set columns while the caches are invalidated
+        await asyncio.gather(db.refresh(db_transaction), _invalidate_derived(current_user.id))
         
         logger.info(f"Transaction {db_transaction.id} created successfully")
         return db_transaction
         
     except HTTPException:
-        db.rollback()
+        await db.rollback()
         raise
     except IntegrityError as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"Database integrity error creating transaction: {str(e)}")
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Invalid transaction data provided"
         )
     except SQLAlchemyError as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"Database error creating transaction: {str(e)}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Database error occurred while creating transaction"
         )
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"Unexpected error creating transaction: {str(e)}", exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -138,22 +289,31 @@ def create_transaction(
 
 
 @router.get("/", response_model=List[TransactionSchema])
-def list_transactions(
+async def list_transactions(
     skip: int = Query(0, ge=0, description="Number of records to skip"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor value from the previous page"),
     limit: int = Query(20, ge=1, le=100, description="Maximum number of records to return"),
     category: Optional[str] = Query(None, description="Filter by category"),
     transaction_type: Optional[str] = Query(None, description="Filter by type (income/expense)"),
     start_date: Optional[date] = Query(None, description="Filter by start date"),
     end_date: Optional[date] = Query(None, description="Filter by end date"),
     account_id: Optional[int] = Query(None, description="Filter by account ID"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """
     List transactions with advanced filtering and pagination.
     
+    Pages are ordered newest first. The X-Next-Cursor response header
+    carries the position of the last row returned; pass it back as cursor
+    to fetch the next page without scanning the skipped rows. The first
+    page also carries X-Total-Count-Estimate on PostgreSQL, the planner's
+    estimate of the number of matching transactions.
+    
     Args:
-        skip: Number of records to skip for pagination
+        skip: Number of records to skip for pagination (prefer cursor for
+            deep pages; not combined with cursor)
+        cursor: Position to continue after, from a previous X-Next-Cursor
         limit: Maximum number of records to return
         category: Filter by category
         transaction_type: Filter by type (income or expense)
@@ -167,8 +327,15 @@ def list_transactions(
         List[TransactionSchema]: List of transactions matching filters
         
     Raises:
-        HTTPException: If fetching transactions fails
+        HTTPException: If both cursor and skip are given, or fetching
+            transactions fails
     """
+    if cursor and skip:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Use either cursor or skip, not both"
+        )
+    
     try:
         logger.debug(
             f"User {current_user.id} fetching transactions "
@@ -176,43 +343,59 @@ def list_transactions(
             f"type={transaction_type}, account={account_id})"
         )
         
-        # Build base query
-        query = db.query(Transaction).filter(
-            Transaction.user_id == current_user.id
-        )
+        # Apply the filters that were given
+        params = {
+            "user_id": current_user.id,
+            "category": category,
+            "transaction_type": transaction_type,
+            "start_date": start_date,
+            "end_date": end_date,
+            "account_id": account_id,
+        }
+        filters = tuple(name for name in _LIST_FILTERS if params[name])
         
-        # Apply filters
-        if category:
-            query = query.filter(Transaction.category == category)
-        if transaction_type:
-            query = query.filter(Transaction.transaction_type == transaction_type)
-        if start_date:
-            query = query.filter(Transaction.transaction_date >= start_date)
-        if end_date:
-            query = query.filter(Transaction.transaction_date <= end_date)
-        if account_id:
-            query = query.filter(Transaction.account_id == account_id)
+        # Estimate the total only for the first page
+        total_estimate = None
+        if not cursor and not skip:
+            total_estimate = await estimated_count(
+                db, _list_statement(filters, False, False), params
+            )
         
-        # Order by date descending and paginate
-        transactions = query.order_by(
-            Transaction.transaction_date.desc()
-        ).offset(skip).limit(limit).all()
+        if cursor:
+            params["cursor_date"], params["cursor_id"] = _decode_cursor(cursor)
+        else:
+            params["skip"] = skip
+        params["limit"] = limit
         
-        # Commit to close transaction
-        db.commit()
+        result = await db.execute(_list_statement(filters, bool(cursor), True), params)
+        transactions = result.all()
+        
+        response = Response(
+            _transaction_list.dump_json(
+                _transaction_list.validate_python(transactions, from_attributes=True)
+            ),
+            media_type="application/json"
+        )
+        if len(transactions) == limit:
+            response.headers["X-Next-Cursor"] = _encode_cursor(transactions[-1])
+        if total_estimate is not None:
+            response.headers["X-Total-Count-Estimate"] = str(total_estimate)
         
         logger.info(f"Retrieved {len(transactions)} transactions for user {current_user.id}")
-        return transactions
+        return response
         
+    except HTTPException:
+        await db.rollback()
+        raise
     except SQLAlchemyError as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"Database error fetching transactions: {str(e)}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Database error occurred while fetching transactions"
         )
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"Unexpected error fetching transactions: {str(e)}", exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -221,16 +404,17 @@ def list_transactions(
 
 
 @router.get("/summary")
-def get_transaction_summary(
+async def get_transaction_summary(
     start_date: Optional[date] = Query(None, description="Start date for summary"),
     end_date: Optional[date] = Query(None, description="End date for summary"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user)
 ) -> Dict[str, Any]:
     """
     Get transaction summary with totals by category.
     
     Returns plain dict instead of Pydantic model to avoid validation issues.
+    Summaries are cached per date window until the user's transactions change.
     
     Args:
         start_date: Start date for summary period
@@ -250,69 +434,68 @@ def get_transaction_summary(
             f"(start={start_date}, end={end_date})"
         )
         
-        # Build query
-        query = db.query(Transaction).filter(
+        key = await _summary_key(current_user.id, start_date, end_date)
+        cached = await store.get(key)
+        if cached is not None:
+            return json.loads(cached)
+        
+        # Aggregate per category in one pass, splitting by type with
+        # conditional sums
+        is_income = Transaction.transaction_type == "income"
+        query = select(
+            Transaction.category,
+            func.count(Transaction.id),
+            func.sum(Transaction.amount),
+            func.sum(case((is_income, Transaction.amount), else_=0.0)),
+            func.sum(case((is_income, 0.0), else_=Transaction.amount)),
+            func.sum(case((Transaction.transaction_type == "expense", Transaction.amount), else_=0.0)),
+        ).where(
             Transaction.user_id == current_user.id
         )
         
         if start_date:
-            query = query.filter(Transaction.transaction_date >= start_date)
+            query = query.where(Transaction.transaction_date >= start_date)
         if end_date:
-            query = query.filter(Transaction.transaction_date <= end_date)
-        
-        transactions = query.all()
-        
-        # Calculate totals
-        total_income = sum(
-            t.amount for t in transactions 
-            if t.transaction_type == "income"
-        )
-        total_expenses = sum(
-            t.amount for t in transactions 
-            if t.transaction_type == "expense"
-        )
-        
-        # Group by category
-        by_category = {}
-        for t in transactions:
-            if t.category not in by_category:
-                by_category[t.category] = {
-                    "total": 0.0,
-                    "count": 0,
-                    "income": 0.0,
-                    "expenses": 0.0
-                }
-            by_category[t.category]["count"] += 1
-            if t.transaction_type == "income":
-                by_category[t.category]["income"] += float(t.amount)
-                by_category[t.category]["total"] += float(t.amount)
-            else:
-                by_category[t.category]["expenses"] += float(t.amount)
-                by_category[t.category]["total"] += float(t.amount)
-        
-        # Commit to close transaction
-        db.commit()
+            query = query.where(Transaction.transaction_date <= end_date)
+        
+        result = await db.execute(query.group_by(Transaction.category))
+        rows = result.all()
+        
+        # Derive totals from the per-category rows
+        by_category = {
+            category: {
+                "total": float(total),
+                "count": count,
+                "income": float(income),
+                "expenses": float(non_income),
+            }
+            for category, count, total, income, non_income, _ in rows
+        }
+        total_income = sum(row[3] for row in rows)
+        total_expenses = sum(row[5] for row in rows)
+        transaction_count = sum(row[1] for row in rows)
         
         summary = {
             "total_income": round(float(total_income), 2),
             "total_expenses": round(float(total_expenses), 2),
             "net": round(float(total_income - total_expenses), 2),
-            "transaction_count": len(transactions),
+            "transaction_count": transaction_count,
             "by_category": by_category
         }
         
+        await store.set(key, json.dumps(summary), ttl=SUMMARY_CACHE_TTL)
         logger.info(f"Transaction summary generated for user {current_user.id}")
         return summary
         
     except SQLAlchemyError as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"Database error generating summary: {str(e)}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Database error occurred while generating summary"
         )
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"Unexpected error generating summary: {str(e)}", exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -321,9 +504,9 @@ def get_transaction_summary(
 
 
 @router.get("/{transaction_id}", response_model=TransactionSchema)
-def get_transaction(
+async def get_transaction(
     transaction_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """
@@ -343,10 +526,13 @@ def get_transaction(
     try:
         logger.debug(f"User {current_user.id} fetching transaction {transaction_id}")
         
-        transaction = db.query(Transaction).filter(
-            Transaction.id == transaction_id,
-            Transaction.user_id == current_user.id
-        ).first()
+        result = await db.execute(
+            select(*TRANSACTION_COLUMNS).where(
+                Transaction.id == transaction_id,
+                Transaction.user_id == current_user.id
+            )
+        )
+        transaction = result.one_or_none()
         
         if not transaction:
             logger.warning(f"Transaction {transaction_id} not found for user {current_user.id}")
@@ -355,24 +541,21 @@ def get_transaction(
                 detail=f"Transaction with ID {transaction_id} not found"
             )
         
-        # Commit to close transaction
-        db.commit()
-        
         logger.info(f"Transaction {transaction_id} retrieved successfully")
         return transaction
         
     except HTTPException:
-        db.rollback()
+        await db.rollback()
         raise
     except SQLAlchemyError as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"Database error fetching transaction {transaction_id}: {str(e)}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Database error occurred while fetching transaction"
         )
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"Unexpected error fetching transaction {transaction_id}: {str(e)}", exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -381,10 +564,10 @@ def get_transaction(
 
 
 @router.put("/{transaction_id}", response_model=TransactionSchema)
-def update_transaction(
+async def update_transaction(
     transaction_id: int,
     transaction_in: TransactionUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """
@@ -408,10 +591,13 @@ def update_transaction(
         logger.info(f"User {current_user.id} updating transaction {transaction_id}")
         
         # Fetch transaction
-        transaction = db.query(Transaction).filter(
-            Transaction.id == transaction_id,
-            Transaction.user_id == current_user.id
-        ).first()
+        result = await db.execute(
+            select(Transaction).where(
+                Transaction.id == transaction_id,
+                Transaction.user_id == current_user.id
+            )
+        )
+        transaction = result.scalar_one_or_none()
         
         if not transaction:
             logger.warning(f"Transaction {transaction_id} not found for user {current_user.id}")
@@ -420,62 +606,53 @@ def update_transaction(
                 detail=f"Transaction with ID {transaction_id} not found"
             )
         
-        # Get associated account
-        account = db.query(Account).filter(
-            Account.id == transaction.account_id
-        ).first()
-        
         # If amount or type changed, adjust account balance
         update_data = transaction_in.dict(exclude_unset=True)
         
         if "amount" in update_data or "transaction_type" in update_data:
-            # Reverse old transaction
-            if transaction.transaction_type == "income":
-                account.balance -= transaction.amount
-            else:
-                account.balance += transaction.amount
-            
-            # Apply new transaction
+            # Apply the new effect and reverse the old one in one update
             new_amount = update_data.get("amount", transaction.amount)
             new_type = update_data.get("transaction_type", transaction.transaction_type)
+            delta = (
+                _balance_effect(new_type, new_amount)
+                - _balance_effect(transaction.transaction_type, transaction.amount)
+            )
             
-            if new_type == "income":
-                account.balance += new_amount
-            else:
-                account.balance -= new_amount
-            
-            logger.info(f"Account {account.id} balance adjusted")
+            if delta:
+                await _adjust_balance(db, transaction.account_id, current_user.id, delta)
+                logger.info(f"Account {transaction.account_id} balance adjusted by {delta}")
         
         # Update transaction fields
         for field, value in update_data.items():
             setattr(transaction, field, value)
         
         # Commit changes
-        db.commit()
-        db.refresh(transaction)
+        await db.commit()
+        # Reload server-set columns while the caches are invalidated
+        await asyncio.gather(db.refresh(transaction), _invalidate_derived(current_user.id))
         
         logger.info(f"Transaction {transaction_id} updated successfully")
         return transaction
         
     except HTTPException:
-        db.rollback()
+        await db.rollback()
         raise
     except IntegrityError as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"Database integrity error updating transaction {transaction_id}: {str(e)}")
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Invalid data provided for transaction update"
         )
     except SQLAlchemyError as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"Database error updating transaction {transaction_id}: {str(e)}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Database error occurred while updating transaction"
         )
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"Unexpected error updating transaction {transaction_id}: {str(e)}", exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -484,9 +661,9 @@ def update_transaction(
 
 
 @router.delete("/{transaction_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_transaction(
+async def delete_transaction(
     transaction_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """
@@ -507,10 +684,13 @@ def delete_transaction(
         logger.info(f"User {current_user.id} deleting transaction {transaction_id}")
         
         # Fetch transaction
-        transaction = db.query(Transaction).filter(
-            Transaction.id == transaction_id,
-            Transaction.user_id == current_user.id
-        ).first()
+        result = await db.execute(
+            select(Transaction).where(
+                Transaction.id == transaction_id,
+                Transaction.user_id == current_user.id
+            )
+        )
+        transaction = result.scalar_one_or_none()
         
         if not transaction:
             logger.warning(f"Transaction {transaction_id} not found for user {current_user.id}")
@@ -519,38 +699,31 @@ def delete_transaction(
                 detail=f"Transaction with ID {transaction_id} not found"
             )
         
-        # Get associated account and reverse transaction
-        account = db.query(Account).filter(
-            Account.id == transaction.account_id
-        ).first()
-        
-        if account:
-            # Reverse the transaction effect on balance
-            if transaction.transaction_type == "income":
-                account.balance -= transaction.amount
-            else:
-                account.balance += transaction.amount
-            logger.info(f"Account {account.id} balance adjusted after deletion")
+        # Reverse the transaction effect on the account balance
+        delta = -_balance_effect(transaction.transaction_type, transaction.amount)
+        if await _adjust_balance(db, transaction.account_id, current_user.id, delta):
+            logger.info(f"Account {transaction.account_id} balance adjusted after deletion")
         
         # Delete transaction
-        db.delete(transaction)
-        db.commit()
+        await db.delete(transaction)
+        await db.commit()
+        await _invalidate_derived(current_user.id)
         
         logger.info(f"Transaction {transaction_id} deleted successfully")
         return None
         
     except HTTPException:
-        db.rollback()
+        await db.rollback()
         raise
     except SQLAlchemyError as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"Database error deleting transaction {transaction_id}: {str(e)}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Database error occurred while deleting transaction"
         )
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"Unexpected error deleting transaction {transaction_id}: {str(e)}", exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -559,9 +732,9 @@ def delete_transaction(
 
 
 @router.post("/bulk-categorize")
-def bulk_categorize_transactions(
+async def bulk_categorize_transactions(
     transaction_ids: List[int],
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user)
 ) -> Dict[str, Any]:
     """
@@ -579,34 +752,47 @@ def bulk_categorize_transactions(
         HTTPException: If bulk categorization fails
     """
     try:
-        from app.ml_models.categorizer import categorizer
-        
         logger.info(f"User {current_user.id} bulk categorizing {len(transaction_ids)} transactions")
         
-        updated_count = 0
-        failed_count = 0
+        # Fetch the requested descriptions in one query
+        result = await db.execute(
+            select(Transaction.id, Transaction.description).where(
+                Transaction.user_id == current_user.id,
+                Transaction.id.in_(transaction_ids)
+            )
+        )
+        to_categorize = [(txn_id, desc) for txn_id, desc in result.all() if desc]
         
-        for txn_id in transaction_ids:
+        # Categorize every description in a single batch
+        predictions = []
+        if to_categorize:
             try:
-                transaction = db.query(Transaction).filter(
-                    Transaction.id == txn_id,
-                    Transaction.user_id == current_user.id
-                ).first()
-                
-                if transaction and transaction.description:
-                    category, confidence = categorizer.predict(transaction.description)
-                    transaction.category = category
-                    transaction.auto_categorized = 1
-                    transaction.category_confidence = confidence
-                    updated_count += 1
-                else:
-                    failed_count += 1
-                    
+                predictions = await run_in_threadpool(
+                    categorizer.predict_batch,
+                    [desc for _, desc in to_categorize]
+                )
             except Exception as e:
-                logger.warning(f"Failed to categorize transaction {txn_id}: {str(e)}")
-                failed_count += 1
-        
-        db.commit()
+                logger.warning(f"Failed to categorize transactions: {str(e)}")
+        
+        # Write all categories back as one executemany UPDATE by primary key
+        updates = [
+            {
+                "id": txn_id,
+                "category": category,
+                "auto_categorized": 1,
+                "category_confidence": float(confidence),
+            }
+            for (txn_id, _), (category, confidence) in zip(to_categorize, predictions)
+        ]
+        if updates:
+            await db.execute(update(Transaction), updates)
+        
+        categorized_ids = {row["id"] for row in updates}
+        updated_count = sum(1 for txn_id in transaction_ids if txn_id in categorized_ids)
+        failed_count = len(transaction_ids) - updated_count
+        
+        await db.commit()
+        await _invalidate_derived(current_user.id)
         
         result = {
             "updated": updated_count,
@@ -617,21 +803,15 @@ def bulk_categorize_transactions(
         logger.info(f"Bulk categorization complete: {result}")
         return result
         
-    except ImportError:
-        db.rollback()
-        raise HTTPException(
-            status_code=status.HTTP_501_NOT_IMPLEMENTED,
-            detail="ML categorizer not available"
-        )
     except SQLAlchemyError as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"Database error in bulk categorization: {str(e)}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Database error occurred during bulk categorization"
         )
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"Unexpected error in bulk categorization: {str(e)}", exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -1,31 +1,47 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Response, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.api.deps import get_db, get_current_active_user
-from app.core.security import get_password_hash
+from app.api.deps import get_async_db, get_current_active_user, invalidate_user_cache
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.security import get_password_hash, revoke_user_tokens
 from app.models.user import User
 from app.schemas.user import User as UserSchema, UserUpdate
 
 router = APIRouter()
 
+# Serialized /me bodies keyed by user ID, each stored with the cached User it
+# was built from. A body is reused only while the authentication cache still
+# returns that same instance, so it never outlives invalidate_user_cache().
+_me_bodies = TTLCache(maxsize=10_000, ttl=settings.USER_CACHE_TTL)
+
 
 @router.get("/me", response_model=UserSchema)
-def read_current_user(
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+async def read_current_user(
+    current_user: User = Depends(get_current_active_user)
 ):
-    try:
-        db.commit()  # ✅ Commit to close transaction
-        return current_user
-    except Exception as e:
-        db.rollback()
-        raise HTTPException(...)
+    """
+    Get current user information.
+    
+    Args:
+        current_user: Current authenticated user
+        
+    Returns:
+        User object, as JSON
+    """
+    entry = _me_bodies.get(current_user.id)
+    if entry is None or entry[0] is not current_user:
+        body = UserSchema.model_validate(current_user).model_dump_json()
+        entry = (current_user, body)
+        _me_bodies.set(current_user.id, entry)
+    return Response(content=entry[1], media_type="application/json")
 
 
 @router.put("/me", response_model=UserSchema)
-def update_current_user(
+async def update_current_user(
     user_in: UserUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """
@@ -39,44 +55,55 @@ def update_current_user(
     Returns:
         Updated user object
     """
+    # current_user is a cached, detached instance; update a fresh copy
+    user = await db.get(User, current_user.id)
+
     # Update fields if provided
     if user_in.full_name is not None:
-        current_user.full_name = user_in.full_name
+        user.full_name = user_in.full_name
     
     if user_in.preferred_currency is not None:
-        current_user.preferred_currency = user_in.preferred_currency
+        user.preferred_currency = user_in.preferred_currency
     
     if user_in.password is not None:
-        current_user.hashed_password = get_password_hash(user_in.password)
+        # Hash off the event loop; password hashing is deliberately slow
+        user.hashed_password = await run_in_threadpool(
+            get_password_hash, user_in.password
+        )
     
-    db.commit()
-    db.refresh(current_user)
+    await db.commit()
+    await db.refresh(user)
+    invalidate_user_cache(user.id)
     
-    return current_user
+    return user
 
 
 @router.delete("/me", status_code=status.HTTP_204_NO_CONTENT)
-def delete_current_user(
-    db: Session = Depends(get_db),
+async def delete_current_user(
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """
     Delete current user account.
     
     Args:
+        background_tasks: Used to revoke the user's refresh tokens
         db: Database session
         current_user: Current authenticated user
     """
-    db.delete(current_user)
-    db.commit()
+    user = await db.get(User, current_user.id)
+    await db.delete(user)
+    await db.commit()
+    invalidate_user_cache(current_user.id)
+    background_tasks.add_task(revoke_user_tokens, current_user.id)
     
     return None
 
 
 @router.get("/{user_id}", response_model=UserSchema)
-def read_user(
+async def read_user(
     user_id: int,
-    db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """
@@ -85,7 +112,6 @@ def read_user(
     
     Args:
         user_id: User ID to retrieve
-        db: Database session
         current_user: Current authenticated user
         
     Returns:
@@ -100,11 +126,5 @@ def read_user(
             detail="Not authorized to access this user's information"
         )
     
-    user = db.query(User).filter(User.id == user_id).first()
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="User not found"
-        )
-    
-    return user
\ No newline at end of file
+    # Only the caller's own profile is readable, and it is already loaded
+    return current_user
\ No newline at end of file
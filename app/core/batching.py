@@ -0,0 +1,95 @@
+"""
+Micro-batching for work that is cheaper done many items at a time.
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, List, Optional, Sequence, Tuple
+
+
+class MicroBatcher:
+    """
+    Coalesces concurrent single-item calls into one batched call.
+
+    The first item in a batch waits up to max_wait seconds for others; a
+    full batch runs immediately. The handler receives the batch's items
+    and returns one result per item, in order. Must be used from a single
+    event loop.
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[List[Any]], Awaitable[Sequence[Any]]],
+        max_size: int,
+        max_wait: float,
+    ):
+        """
+        Initialize the batcher.
+
+        Args:
+            handler: Coroutine function processing a list of items
+            max_size: Maximum items per batch
+            max_wait: Seconds a batch stays open for more items
+        """
+        self.handler = handler
+        self.max_size = max_size
+        self.max_wait = max_wait
+        self._pending: List[Tuple[Any, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+    async def submit(self, item: Any) -> Any:
+        """
+        Add an item to the next batch and wait for its result.
+
+        Args:
+            item: Item passed to the handler
+
+        Returns:
+            The handler's result for this item
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((item, future))
+
+        if len(self._pending) >= self.max_size:
+            self._flush()
+        elif len(self._pending) == 1:
+            self._timer = loop.call_later(self.max_wait, self._flush)
+
+        return await future
+
+    def _flush(self) -> None:
+        """Close the open batch and start processing it."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            asyncio.ensure_future(self._run(batch))
+
+    async def _run(self, batch: List[Tuple[Any, asyncio.Future]]) -> None:
+        """Run the handler on a batch and resolve each caller."""
+        try:
+            results = await self.handler([item for item, _ in batch])
+        except Exception as e:
+            self._fail(batch, e)
+            return
+
+        if len(results) != len(batch):
+            self._fail(
+                batch,
+                RuntimeError(
+                    f"Batch handler returned {len(results)} results for {len(batch)} items"
+                ),
+            )
+            return
+
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    @staticmethod
+    def _fail(batch: List[Tuple[Any, asyncio.Future]], error: Exception) -> None:
+        """Raise error in every caller still waiting on the batch."""
+        for _, future in batch:
+            if not future.done():
+                future.set_exception(error)
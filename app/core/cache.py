@@ -0,0 +1,105 @@
+"""
+In-process TTL cache for hot, rarely-changing lookups.
+"""
+
+import threading
+import time
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+
+class TTLCache:
+    """
+    Thread-safe in-memory cache whose entries expire after a time-to-live.
+
+    Each entry may carry its own TTL (e.g. so a cached token claim never
+    outlives the token's ``exp``). When the cache is full, expired entries
+    are purged first and then the oldest entry is evicted.
+    """
+
+    def __init__(self, maxsize: int = 10_000, ttl: float = 60.0):
+        """
+        Initialize the cache.
+
+        Args:
+            maxsize: Maximum number of entries kept
+            ttl: Default time-to-live in seconds
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: Dict[Hashable, Tuple[Any, float]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the cached value for key, or default if missing/expired."""
+        now = time.monotonic()
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return default
+            value, expires_at = item
+            if expires_at <= now:
+                del self._data[key]
+                return default
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """
+        Store a value.
+
+        Args:
+            key: Cache key
+            value: Value to cache
+            ttl: Optional per-entry time-to-live in seconds (defaults to self.ttl)
+        """
+        ttl = self.ttl if ttl is None else ttl
+        if ttl <= 0:
+            return
+
+        now = time.monotonic()
+        with self._lock:
+            self._data.pop(key, None)
+            if len(self._data) >= self.maxsize:
+                self._evict(now)
+            self._data[key] = (value, now + ttl)
+
+    def incr(self, key: Hashable, ttl: Optional[float] = None) -> int:
+        """
+        Increment an integer counter, starting a new one at 1 if missing or
+        expired. The expiry is set when the counter starts and is kept by
+        later increments.
+        """
+        ttl = self.ttl if ttl is None else ttl
+        now = time.monotonic()
+        with self._lock:
+            item = self._data.get(key)
+            if item is None or item[1] <= now:
+                self._data.pop(key, None)
+                if len(self._data) >= self.maxsize:
+                    self._evict(now)
+                self._data[key] = (1, now + ttl)
+                return 1
+            value, expires_at = item
+            self._data[key] = (value + 1, expires_at)
+            return value + 1
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """Remove a key and return its value (expired or not)."""
+        with self._lock:
+            item = self._data.pop(key, None)
+        return default if item is None else item[0]
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def _evict(self, now: float) -> None:
+        """Drop expired entries, then the oldest ones until there is room."""
+        expired = [k for k, (_, expires_at) in self._data.items() if expires_at <= now]
+        for k in expired:
+            del self._data[k]
+        while len(self._data) >= self.maxsize:
+            del self._data[next(iter(self._data))]
@@ -1,20 +1,39 @@
+import asyncio
+import json
+import logging
+from typing import Optional
+
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool, QueuePool
 from app.core.config import settings
 
 
-# Create database engine
-engine = create_engine(
-    settings.DATABASE_URL,
-    pool_pre_ping=True,  # Verify connections before using
-    pool_size=10,  # Number of connections to maintain
-    max_overflow=20,  # Additional connections when pool is full
-    echo=settings.DEBUG,  # Log SQL queries in debug mode
+# Sync engine; only used at startup (create_all), so it keeps no
+# connections open and leaves the server's connection limit to the async pool
+engine = create_engine(settings.DATABASE_URL, poolclass=NullPool)
+
+# SQL logging goes through the standard logging tree (one logger for both
+# engines) and is opt-in, since formatting every statement is expensive
+if settings.DB_ECHO:
+    logging.getLogger("sqlalchemy.engine").setLevel(logging.INFO)
+
+# Async engine (asyncpg) for endpoints using AsyncSession
+async_engine = create_async_engine(
+    settings.ASYNC_DATABASE_URL,
+    pool_pre_ping=True,
+    pool_use_lifo=True,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    pool_recycle=settings.DB_POOL_RECYCLE,
 )
 
-# Create SessionLocal class
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Objects stay usable after commit without an implicit reload
+AsyncSessionLocal = async_sessionmaker(
+    async_engine, autoflush=False, expire_on_commit=False
+)
 
 # Create Base class for models
 Base = declarative_base()
@@ -26,23 +45,6 @@ from app.models.budget import Budget
 from app.models.prediction import Prediction
 
 
-def get_db():
-    """
-    Dependency function to get database session.
-    Yields a database session and ensures it's closed after use.
-
-    Usage in endpoints:
-        @app.get("/items")
-        def read_items(db: Session = Depends(get_db)):
-            return db.query(Item).all()
-    """
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
-
 def init_db():
     """
     Initialize database - create all tables.
@@ -50,3 +52,51 @@ def init_db():
     """
     Base.metadata.create_all(bind=engine)
     print("✅ Database initialized successfully!")
+
+
+def _pool_size(pool) -> int:
+    """Number of persistent connections a pool keeps (0 for non-queue pools)."""
+    return pool.size() if isinstance(pool, QueuePool) else 0
+
+
+async def warm_pools():
+    """
+    Open pool_size connections on the async engine and return them to the
+    pool, so the first requests after startup don't pay the connect
+    handshake. Called on application startup.
+    """
+    conns = await asyncio.gather(
+        *(async_engine.connect() for _ in range(_pool_size(async_engine.pool)))
+    )
+    await asyncio.gather(*(conn.close() for conn in conns))
+
+
+async def estimated_count(db: AsyncSession, stmt, params: Optional[dict] = None) -> Optional[int]:
+    """
+    Row count the PostgreSQL planner estimates for a SELECT, read from
+    EXPLAIN without running the query. Much cheaper than COUNT(*) on large
+    tables, but only approximate.
+
+    Args:
+        db: Async database session
+        stmt: SELECT statement to estimate
+        params: Values for the statement's bind parameters, if not embedded
+
+    Returns:
+        Estimated number of rows, or None on databases other than PostgreSQL
+    """
+    dialect = db.bind.dialect
+    if dialect.name != "postgresql":
+        return None
+
+    compiled = stmt.compile(dialect=dialect)
+    params = {**compiled.params, **(params or {})}
+    if compiled.positiontup is not None:
+        params = tuple(params[name] for name in compiled.positiontup)
+
+    conn = await db.connection()
+    result = await conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled}", params)
+    plan = result.scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
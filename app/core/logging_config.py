@@ -0,0 +1,70 @@
+"""
+Logging setup.
+
+Log calls only put the record on a queue; a background listener thread
+formats records and writes them to the console and, outside DEBUG, to
+app.log as one JSON object per line.
+"""
+
+import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
+
+import orjson
+
+from app.core.config import settings
+
+TEXT_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+
+class JSONFormatter(logging.Formatter):
+    """Formats each record as a single-line JSON object."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return orjson.dumps(entry).decode()
+
+
+class _LocalQueueHandler(QueueHandler):
+    """
+    QueueHandler for an in-process queue. Records are enqueued as they are,
+    so message formatting also happens on the listener thread.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+def setup_logging() -> QueueListener:
+    """
+    Route the root logger through a queue to a listener.
+
+    Returns:
+        The listener; records are queued until it is started, and stopping
+        it flushes pending records
+    """
+    if settings.DEBUG:
+        console = logging.StreamHandler()
+        console.setFormatter(logging.Formatter(TEXT_FORMAT))
+        handlers = [console]
+    else:
+        console = logging.StreamHandler()
+        console.setFormatter(JSONFormatter())
+        log_file = logging.FileHandler("app.log")
+        log_file.setFormatter(JSONFormatter())
+        handlers = [console, log_file]
+
+    log_queue = queue.Queue(-1)
+    logging.basicConfig(
+        level=getattr(logging, settings.LOG_LEVEL.upper(), logging.INFO),
+        handlers=[_LocalQueueHandler(log_queue)],
+    )
+
+    return QueueListener(log_queue, *handlers, respect_handler_level=True)
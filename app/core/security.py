@@ -1,11 +1,57 @@
-from datetime import datetime, timedelta
-from typing import Optional, Union, Dict, Any
-from jose import JWTError, jwt
+from datetime import timedelta
+from typing import Optional, Union, Dict, Any, Tuple
+import hashlib
+import time
+import jwt
+from jwt import InvalidTokenError
 from passlib.context import CryptContext
+from app.core.cache import TTLCache
 from app.core.config import settings
+from app.core.store import store
+
+# Password hashing context: Argon2id (cost from settings) for new hashes;
+# legacy bcrypt hashes still verify and are upgraded on login
+pwd_context = CryptContext(
+    schemes=["argon2", "bcrypt"],
+    deprecated="auto",
+    argon2__type="ID",
+    argon2__time_cost=settings.ARGON2_TIME_COST,
+    argon2__memory_cost=settings.ARGON2_MEMORY_COST,
+    argon2__parallelism=settings.ARGON2_PARALLELISM,
+    argon2__digest_size=32,
+    argon2__salt_size=16,
+)
+
+# JWT parameters resolved once at import instead of on every call; the key
+# is pre-encoded so PyJWT's HMAC setup skips the str-to-bytes conversion
+_JWT_KEY = settings.SECRET_KEY.encode()
+_JWT_ALG = settings.ALGORITHM
+_JWT_ALGS = (_JWT_ALG,)
+_JWT_DECODE_OPTIONS = {"require": ["exp", "sub"], "verify_aud": False}
+
+# Default token lifetimes in seconds; exp is written as epoch seconds
+ACCESS_TOKEN_TTL = settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+REFRESH_TOKEN_TTL = settings.REFRESH_TOKEN_EXPIRE_DAYS * 86400
+
+# Verified payloads keyed by a digest of the raw token, so repeated
+# requests with the same token skip signature verification. Every decoder
+# below goes through decode_token and shares this cache
+_payload_cache = TTLCache(maxsize=10_000, ttl=settings.AUTH_CACHE_TTL)
+
+
+def _token_key(token: str) -> bytes:
+    """Compact cache key for a raw token."""
+    return hashlib.blake2b(token.encode(), digest_size=16).digest()
+
+
+def _cache_ttl(payload: Dict[str, Any]) -> float:
+    """AUTH_CACHE_TTL, clamped so a cached entry never outlives the token."""
+    ttl = settings.AUTH_CACHE_TTL
+    exp = payload.get("exp")
+    if exp is not None:
+        ttl = min(ttl, exp - time.time())
+    return ttl
 
-# Password hashing context
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """
@@ -20,6 +66,21 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     """
     return pwd_context.verify(plain_password, hashed_password)
 
+def verify_and_update_password(
+    plain_password: str, hashed_password: str
+) -> Tuple[bool, Optional[str]]:
+    """
+    Verify a password and produce a replacement hash if the stored one is outdated.
+    
+    Args:
+        plain_password: The plain text password
+        hashed_password: The hashed password from database
+        
+    Returns:
+        (True if password matches, new hash to store or None)
+    """
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
 def get_password_hash(password: str) -> str:
     """
     Hash a password for storing.
@@ -45,18 +106,12 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     """
     to_encode = data.copy()
     
-    if expires_delta:
-        expire = datetime.utcnow() + expires_delta
-    else:
-        expire = datetime.utcnow() + timedelta(
-            minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES
-        )
-    
-    to_encode.update({"exp": expire, "type": "access"})
+    ttl = int(expires_delta.total_seconds()) if expires_delta else ACCESS_TOKEN_TTL
+    to_encode.update({"exp": int(time.time()) + ttl, "type": "access"})
     encoded_jwt = jwt.encode(
         to_encode, 
-        settings.SECRET_KEY, 
-        algorithm=settings.ALGORITHM
+        _JWT_KEY, 
+        algorithm=_JWT_ALG
     )
     
     return encoded_jwt
@@ -75,18 +130,13 @@ def create_refresh_token(data: dict, expires_delta: Optional[timedelta] = None)
     """
     to_encode = data.copy()
     
-    if expires_delta:
-        expire = datetime.utcnow() + expires_delta
-    else:
-        expire = datetime.utcnow() + timedelta(
-            days=settings.REFRESH_TOKEN_EXPIRE_DAYS
-        )
-    
-    to_encode.update({"exp": expire, "type": "refresh"})
+    now = int(time.time())
+    ttl = int(expires_delta.total_seconds()) if expires_delta else REFRESH_TOKEN_TTL
+    to_encode.update({"iat": now, "exp": now + ttl, "type": "refresh"})
     encoded_jwt = jwt.encode(
         to_encode, 
-        settings.SECRET_KEY, 
-        algorithm=settings.ALGORITHM
+        _JWT_KEY, 
+        algorithm=_JWT_ALG
     )
     
     return encoded_jwt
@@ -102,20 +152,43 @@ def decode_access_token(token: str) -> Optional[Dict[str, Any]]:
         Decoded token payload if valid, None otherwise
     """
     try:
-        payload = jwt.decode(
-            token, 
-            settings.SECRET_KEY, 
-            algorithms=[settings.ALGORITHM]
-        )
+        payload = decode_token(token)
         
         # Check token type
         if payload.get("type") != "access":
             return None
             
         return payload
-    except JWTError:
+    except InvalidTokenError:
         return None
 
+def decode_token(token: str) -> Dict[str, Any]:
+    """
+    Decode and verify a JWT of any type, caching the verified payload.
+    
+    Args:
+        token: JWT token string
+        
+    Returns:
+        Decoded token payload
+        
+    Raises:
+        InvalidTokenError: If the token is invalid or expired
+    """
+    key = _token_key(token)
+    payload = _payload_cache.get(key)
+    if payload is not None:
+        return payload
+
+    payload = jwt.decode(
+        token,
+        _JWT_KEY,
+        algorithms=_JWT_ALGS,
+        options=_JWT_DECODE_OPTIONS,
+    )
+    _payload_cache.set(key, payload, ttl=_cache_ttl(payload))
+    return payload
+
 # CRITICAL: Add missing function
 def verify_refresh_token(token: str) -> Optional[Dict[str, Any]]:
     """
@@ -128,34 +201,83 @@ def verify_refresh_token(token: str) -> Optional[Dict[str, Any]]:
         Decoded token payload if valid, None otherwise
     """
     try:
-        payload = jwt.decode(
-            token, 
-            settings.SECRET_KEY, 
-            algorithms=[settings.ALGORITHM]
-        )
+        payload = decode_token(token)
         
         # Check token type
         if payload.get("type") != "refresh":
             return None
             
         return payload
-    except JWTError:
+    except InvalidTokenError:
         return None
 
 
 def get_user_id_from_token(token: str) -> Optional[int]:
     """
     Extract user ID from JWT token.
+
+    Verified payloads are cached for AUTH_CACHE_TTL seconds, and never
+    past the token's own expiry (see decode_token).
     """
     try:
-        payload = jwt.decode(
-            token, 
-            settings.SECRET_KEY, 
-            algorithms=[settings.ALGORITHM]
-        )
-        user_id: str = payload.get("sub")
-        if user_id is None:
-            return None
-        return int(user_id)
-    except (JWTError, ValueError):
-        return None
\ No newline at end of file
+        return int(decode_token(token)["sub"])
+    except (InvalidTokenError, KeyError, ValueError):
+        return None
+
+
+# Refresh-token rotation. With a shared (Redis) store every refresh token
+# is single-use: its jti is registered when issued and consumed on refresh.
+# Without one, refresh tokens stay stateless, since per-worker state would
+# reject tokens issued by another worker.
+
+def _refresh_key(jti: str) -> str:
+    return f"refresh:{jti}"
+
+
+def _revoked_key(user_id: int) -> str:
+    return f"revoked_user:{user_id}"
+
+
+async def register_refresh_token(jti: str, user_id: int) -> None:
+    """
+    Record a newly issued refresh token so it can be used once.
+    
+    Args:
+        jti: The token's unique ID claim
+        user_id: ID of the user the token was issued to
+    """
+    if store.is_shared:
+        await store.set(_refresh_key(jti), str(user_id), ttl=REFRESH_TOKEN_TTL)
+
+
+async def consume_refresh_token(payload: Dict[str, Any]) -> bool:
+    """
+    Use up a verified refresh token.
+    
+    Args:
+        payload: Verified refresh token payload
+        
+    Returns:
+        True if the token may be exchanged, False if it was already used,
+        never registered, or its user's tokens were revoked
+    """
+    if not store.is_shared:
+        return True
+
+    jti = payload.get("jti")
+    if not jti or await store.getdel(_refresh_key(jti)) != payload.get("sub"):
+        return False
+
+    revoked_at = await store.get(_revoked_key(payload["sub"]))
+    return revoked_at is None or payload.get("iat", 0) > int(revoked_at)
+
+
+async def revoke_user_tokens(user_id: int) -> None:
+    """
+    Invalidate every refresh token issued to a user so far.
+    
+    Args:
+        user_id: ID of the user whose tokens are revoked
+    """
+    if store.is_shared:
+        await store.set(_revoked_key(user_id), str(int(time.time())), ttl=REFRESH_TOKEN_TTL)
@@ -0,0 +1,97 @@
+"""
+Shared key-value store for state that must be visible to every worker.
+
+Backed by Redis when REDIS_URL is set. Without it, values live in an
+in-process TTL cache, which is only shared within a single worker.
+"""
+
+import logging
+from typing import Optional
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:  # redis is optional
+    aioredis = None
+
+logger = logging.getLogger(__name__)
+
+
+class SharedStore:
+    """
+    Minimal async string store (get/set/getdel/delete/incr) with expiry.
+    """
+
+    def __init__(self, url: str = ""):
+        """
+        Initialize the store.
+
+        Args:
+            url: Redis connection URL; empty to use the in-process fallback
+        """
+        self._redis = None
+        self._local = TTLCache(maxsize=100_000, ttl=3600)
+
+        if url and aioredis is None:
+            logger.warning("REDIS_URL is set but redis is not installed; using in-process store")
+        elif url:
+            self._redis = aioredis.from_url(url, decode_responses=True)
+
+    @property
+    def is_shared(self) -> bool:
+        """True if values are visible to all workers (Redis-backed)."""
+        return self._redis is not None
+
+    async def get(self, key: str) -> Optional[str]:
+        """Return the value for key, or None if missing/expired."""
+        if self._redis is not None:
+            return await self._redis.get(key)
+        return self._local.get(key)
+
+    async def set(self, key: str, value: str, ttl: int) -> None:
+        """Store a value that expires after ttl seconds."""
+        if self._redis is not None:
+            await self._redis.set(key, value, ex=ttl)
+        else:
+            self._local.set(key, value, ttl=ttl)
+
+    async def getdel(self, key: str) -> Optional[str]:
+        """Atomically return and remove a value."""
+        if self._redis is not None:
+            return await self._redis.getdel(key)
+        value = self._local.get(key)
+        self._local.pop(key)
+        return value
+
+    async def delete(self, *keys: str) -> None:
+        """Remove keys if present."""
+        if not keys:
+            return
+        if self._redis is not None:
+            await self._redis.delete(*keys)
+        else:
+            for key in keys:
+                self._local.pop(key)
+
+    async def incr(self, key: str, ttl: int) -> int:
+        """
+        Increment a counter and return the new value. A new counter
+        expires after ttl seconds.
+        """
+        if self._redis is not None:
+            value = await self._redis.incr(key)
+            if value == 1:
+                await self._redis.expire(key, ttl)
+            return value
+        return self._local.incr(key, ttl=ttl)
+
+    async def close(self) -> None:
+        """Close the Redis connection pool. Called on application shutdown."""
+        if self._redis is not None:
+            await self._redis.aclose()
+
+
+# Global instance
+store = SharedStore(settings.REDIS_URL)
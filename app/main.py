@@ -2,63 +2,36 @@
 Main FastAPI application entry point.
 """
 
-from fastapi import FastAPI, Request
-from fastapi.middleware.cors import CORSMiddleware
+from fastapi import FastAPI, Request, status
+from fastapi.responses import ORJSONResponse, Response
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
-from contextlib import asynccontextmanager
+from contextlib import asynccontextmanager, suppress
+import asyncio
+from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 import time
 import logging
-import json
 
-# Fix: Import settings from the correct location
-try:
-    # Try importing from app.core.config (common structure)
-    from app.core.config import settings
-except ImportError:
-    try:
-        # Try importing from core.config (if config is in root)
-        from core.config import settings
-    except ImportError:
-        # Fall back to relative import
-        from .core.config import settings
-
-# Try to import database and other modules
-try:
-    from app.core.database import init_db
-    from app.api.v1 import (
-        auth,
-        users,
-        ml,
-        market,
-        accounts,
-        transactions,
-        budgets,
-        currency,
-    )
-
-    # Import models to register them with SQLAlchemy
-    from app.models import user, prediction, account, transaction, budget
-except ImportError as e:
-    # Log import errors but continue for now
-    print(f"Warning: Could not import some modules: {e}")
+from app.core.config import settings
+
+from app.api.v1 import (
+    auth,
+    users,
+    ml,
+    market,
+    accounts,
+    transactions,
+    budgets,
+    currency,
+)
 
-    # Create dummy routers for now
-    class DummyRouter:
-        router = None
+# Import models to register them with SQLAlchemy
+from app.models import user, prediction, account, transaction, budget
 
-    auth = users = ml = market = accounts = transactions = budgets = currency = (
-        DummyRouter()
-    )
+# Setup logging; records are written by a background listener thread
+from app.core.logging_config import setup_logging
 
-# Setup logging
-logging.basicConfig(
-    level=getattr(logging, settings.LOG_LEVEL.upper(), logging.INFO),
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-    handlers=[
-        logging.StreamHandler(),
-        logging.FileHandler("app.log") if not settings.DEBUG else logging.NullHandler(),
-    ],
-)
+log_listener = setup_logging()
 logger = logging.getLogger(__name__)
 
 
@@ -69,6 +42,7 @@ async def lifespan(app: FastAPI):
     Runs on startup and shutdown.
     """
     # Startup
+    log_listener.start()
     logger.info("Starting AI Finance Manager API...")
     logger.info(f"Project: {settings.PROJECT_NAME}")
     logger.info(f"Version: {settings.VERSION}")
@@ -84,17 +58,31 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.error(f"Database initialization failed: {e}")
 
-    # Initialize ML models
+    # Pre-open pooled database connections
+    try:
+        from app.core.database import warm_pools
+
+        await warm_pools()
+        logger.info("Database connection pools warmed")
+    except Exception as e:
+        logger.warning(f"Database pool warm-up failed: {e}")
+
+    # Load the ML models and run a first prediction ahead of requests
     try:
-        from app.ml_models.categorizer import initialize_model
+        from app.ml_models.categorizer import categorizer
 
-        initialize_model()
+        categorizer.warmup()
         logger.info("ML models initialized")
     except ImportError as e:
         logger.warning(f"ML model module not found: {e}")
     except Exception as e:
         logger.warning(f"ML model initialization warning: {e}")
 
+    # Keep the exchange rate table loaded in memory
+    from app.services.currency import currency_service
+
+    rates_task = asyncio.create_task(currency_service.refresh_rate_table())
+
     logger.info("Application startup complete!")
 
     yield
@@ -102,6 +90,21 @@ async def lifespan(app: FastAPI):
     # Shutdown
     logger.info("Shutting down application...")
 
+    # Stop background tasks, then close shared HTTP clients and the shared store
+    from app.core.store import store
+    from app.services.market_data import market_service
+
+    rates_task.cancel()
+    with suppress(asyncio.CancelledError):
+        await rates_task
+
+    await currency_service.close()
+    await market_service.close()
+    await store.close()
+
+    # Flush queued log records
+    log_listener.stop()
+
 
 # Create FastAPI application
 app = FastAPI(
@@ -111,57 +114,54 @@ app = FastAPI(
     docs_url="/docs",
     redoc_url="/redoc",
     openapi_url=f"{settings.API_V1_STR}/openapi.json",
+    default_response_class=ORJSONResponse,  # orjson renders JSON much faster than json
     lifespan=lifespan,
 )
 
-# Configure CORS
-origins = [
-    "http://localhost:3000",
-    "http://localhost:3001", 
-    "http://127.0.0.1:3000",
-    "http://127.0.0.1:3001",
-    "http://localhost:5173",
-    "http://127.0.0.1:5173",
-]   
-
-# Get additional origins from settings
-if hasattr(settings, 'BACKEND_CORS_ORIGINS'):
-    backend_origins = settings.BACKEND_CORS_ORIGINS
-    if isinstance(backend_origins, str):
-        try:
-            backend_origins = json.loads(backend_origins)
-        except:
-            backend_origins = [o.strip() for o in backend_origins.split(',')]
-    
-    if isinstance(backend_origins, list):
-        origins.extend(backend_origins)
+# Database errors are handled here rather than in every endpoint; the
+# session dependencies roll back before these handlers run
+@app.exception_handler(IntegrityError)
+async def integrity_error_handler(request: Request, exc: IntegrityError):
+    logger.error("Integrity error on %s %s: %s", request.method, request.url.path, exc)
+    return ORJSONResponse(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        content={"detail": "Invalid data or conflicting record"},
+    )
 
-# Remove duplicates
-origins = list(set(origins))
 
-logger.info(f"CORS allowed origins: {origins}")
+@app.exception_handler(SQLAlchemyError)
+async def database_error_handler(request: Request, exc: SQLAlchemyError):
+    logger.error("Database error on %s %s: %s", request.method, request.url.path, exc)
+    return ORJSONResponse(
+        status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        content={"detail": "Database error occurred"},
+    )
+
 
-# Add default origins if empty or not a list
-default_origins = [
+# Configure CORS: local frontend dev servers plus BACKEND_CORS_ORIGINS,
+# de-duplicated once at startup
+_DEV_ORIGINS = (
     "http://localhost:3000",
     "http://localhost:3001",
     "http://127.0.0.1:3000",
     "http://127.0.0.1:3001",
-    "http://localhost:5173",  # Vite dev server
-    "http://localhost:5174",  # Vite dev server alt
-    "http://localhost:8000",
-    "http://127.0.0.1:8000",
-    "*",  # Fallback to allow all origins during development
-]
+    "http://localhost:5173",
+    "http://127.0.0.1:5173",
+)
+CORS_ORIGINS = tuple(sorted({*_DEV_ORIGINS, *settings.BACKEND_CORS_ORIGINS}))
+
+logger.info(f"CORS allowed origins: {list(CORS_ORIGINS)}")
 
+from app.middleware.cors import SetCORSMiddleware
 
 app.add_middleware(
-    CORSMiddleware,
-    allow_origins=origins,  # Use the specific origins list WITHOUT "*"
+    SetCORSMiddleware,
+    allow_origins=CORS_ORIGINS,  # Explicit origins, never "*" with credentials
     allow_credentials=True,  # Keep this for cookies/tokens
     allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS", "PATCH"],
-    allow_headers=["*"],
-    expose_headers=["*"],
+    allow_headers=["Authorization", "Content-Type", "X-Requested-With"],
+    # "*" is not honoured for credentialed requests, so name the headers
+    expose_headers=["X-Process-Time", "X-Next-Cursor", "X-Total-Count-Estimate"],
     max_age=3600,
 )
 
@@ -175,141 +175,137 @@ app.add_middleware(
 )
 
 # Add trusted host middleware for security
-# Fix: Check if ALLOWED_HOSTS exists
-if hasattr(settings, "ALLOWED_HOSTS"):
-    app.add_middleware(TrustedHostMiddleware, allowed_hosts=settings.ALLOWED_HOSTS)
-else:
-    logger.warning(
-        "⚠️ ALLOWED_HOSTS not found in settings. Skipping TrustedHostMiddleware."
-    )
-    # Set default allowed hosts
-    settings.ALLOWED_HOSTS = ["*"]
+app.add_middleware(TrustedHostMiddleware, allowed_hosts=settings.ALLOWED_HOSTS)
+
+
+# Probe and static paths that are neither logged nor timed
+_SKIP_LOG_PATHS = frozenset({"/health", "/healthz", "/favicon.ico"})
 
 
 # Middleware to log requests and response times
 @app.middleware("http")
 async def log_requests(request: Request, call_next):
-    start_time = time.time()
+    path = request.url.path
+    if path in _SKIP_LOG_PATHS:
+        return await call_next(request)
 
-    # Get client info
-    client_ip = request.client.host if request.client else "unknown"
-    user_agent = request.headers.get("User-Agent", "unknown")
+    start_ns = time.monotonic_ns()
+    method = request.method
 
     # Log request
-    logger.info(f"Request: {request.method} {request.url.path} from {client_ip}")
+    if logger.isEnabledFor(logging.INFO):
+        client_ip = request.client.host if request.client else "unknown"
+        logger.info("Request: %s %s from %s", method, path, client_ip)
 
     try:
         # Process request
         response = await call_next(request)
-
-        # Calculate processing time
-        process_time = (time.time() - start_time) * 1000
-        response.headers["X-Process-Time"] = f"{process_time:.2f}ms"
-
-        # Log based on status and time
-        status_code = response.status_code
-        if status_code >= 500:
-            logger.error(
-                f"Server Error: {request.method} {request.url.path} - {status_code} in {process_time:.2f}ms"
-            )
-        elif status_code >= 400:
-            logger.warning(
-                f"Client Error: {request.method} {request.url.path} - {status_code} in {process_time:.2f}ms"
-            )
-        elif process_time > 1000:  # More than 1 second
-            logger.warning(
-                f"Slow request: {request.method} {request.url.path} took {process_time:.2f}ms"
-            )
-        else:
-            logger.debug(
-                f"Success: {request.method} {request.url.path} - {status_code} in {process_time:.2f}ms"
-            )
-
-        return response
-
     except Exception as e:
-        process_time = (time.time() - start_time) * 1000
+        process_time = (time.monotonic_ns() - start_ns) / 1e6
         logger.error(
-            f"Request failed: {request.method} {request.url.path} - {str(e)} in {process_time:.2f}ms"
+            "Request failed: %s %s - %s in %.2fms", method, path, e, process_time
         )
         raise
 
+    # Calculate processing time
+    process_time = (time.monotonic_ns() - start_ns) / 1e6
+    response.headers["X-Process-Time"] = f"{process_time:.2f}ms"
 
-# Root endpoint
-@app.get("/")
-def root():
-    """
-    Root endpoint - API information.
-    """
-    return {
+    # Log based on status and time
+    status_code = response.status_code
+    if status_code >= 500:
+        logger.error(
+            "Server Error: %s %s - %s in %.2fms", method, path, status_code, process_time
+        )
+    elif status_code >= 400:
+        logger.warning(
+            "Client Error: %s %s - %s in %.2fms", method, path, status_code, process_time
+        )
+    elif process_time > 1000:  # More than 1 second
+        logger.warning("Slow request: %s %s took %.2fms", method, path, process_time)
+    else:
+        logger.debug(
+            "Success: %s %s - %s in %.2fms", method, path, status_code, process_time
+        )
+
+    return response
+
+
+# API information never changes at runtime, so it is serialized once
+_ROOT_BODY = ORJSONResponse(
+    content={
         "message": "AI Finance Manager API",
         "version": settings.VERSION,
         "status": "running",
         "docs": "/docs",
         "redoc": "/redoc",
     }
+).body
+
+
+# Root endpoint
+@app.get("/")
+async def root():
+    """
+    Root endpoint - API information.
+    """
+    return Response(content=_ROOT_BODY, media_type="application/json")
 
 
 # Health check endpoint
 @app.get("/health")
-def health_check():
+async def health_check():
     """
     Health check endpoint.
     """
     return {"status": "healthy", "version": settings.VERSION, "timestamp": time.time()}
 
 
+# Readiness check: goes through the async connection pool, so probing it
+# also keeps pooled connections warm
+@app.get("/healthz")
+async def readiness_check():
+    """
+    Readiness check endpoint. Runs SELECT 1 on a pooled connection.
+    """
+    from app.core.database import async_engine
+
+    try:
+        async with async_engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+    except Exception as e:
+        logger.warning(f"Readiness check failed: {e}")
+        return ORJSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={"status": "unavailable", "database": "unreachable"},
+        )
+    return {"status": "ready", "database": "ok"}
+
+
 # Favicon endpoint
 @app.get("/favicon.ico")
-def favicon():
+async def favicon():
     """
     Favicon endpoint to prevent 404 errors.
     """
     return {"message": "No favicon"}
 
 
-# Include API routers (only if they exist)
-if hasattr(auth, "router") and auth.router:
-    app.include_router(
-        auth.router, prefix=f"{settings.API_V1_STR}/auth", tags=["Authentication"]
-    )
-
-if hasattr(users, "router") and users.router:
-    app.include_router(
-        users.router, prefix=f"{settings.API_V1_STR}/users", tags=["Users"]
-    )
-
-if hasattr(ml, "router") and ml.router:
-    app.include_router(
-        ml.router, prefix=f"{settings.API_V1_STR}/ml", tags=["Machine Learning"]
-    )
-
-if hasattr(market, "router") and market.router:
-    app.include_router(
-        market.router, prefix=f"{settings.API_V1_STR}/market", tags=["Market Data"]
-    )
-
-# Person B's routers
-if hasattr(accounts, "router") and accounts.router:
-    app.include_router(
-        accounts.router, prefix=f"{settings.API_V1_STR}/accounts", tags=["Accounts"]
-    )
-
-if hasattr(transactions, "router") and transactions.router:
-    app.include_router(
-        transactions.router,
-        prefix=f"{settings.API_V1_STR}/transactions",
-        tags=["Transactions"],
-    )
-
-if hasattr(budgets, "router") and budgets.router:
-    app.include_router(
-        budgets.router, prefix=f"{settings.API_V1_STR}/budgets", tags=["Budgets"]
-    )
+# API routers: (module, URL prefix under API_V1_STR, OpenAPI tag)
+_ROUTERS = (
+    (auth, "auth", "Authentication"),
+    (users, "users", "Users"),
+    (ml, "ml", "Machine Learning"),
+    (market, "market", "Market Data"),
+    (accounts, "accounts", "Accounts"),
+    (transactions, "transactions", "Transactions"),
+    (budgets, "budgets", "Budgets"),
+    (currency, "currency", "Currency"),
+)
 
-if hasattr(currency, "router") and currency.router:
+for module, prefix, tag in _ROUTERS:
     app.include_router(
-        currency.router, prefix=f"{settings.API_V1_STR}/currency", tags=["Currency"]
+        module.router, prefix=f"{settings.API_V1_STR}/{prefix}", tags=[tag]
     )
 
 
@@ -322,5 +318,8 @@ if __name__ == "__main__":
         host=settings.HOST,
         port=settings.PORT,
         reload=settings.DEBUG,
+        workers=1 if settings.DEBUG else settings.WORKERS,
+        loop="uvloop",
+        http="httptools",
         log_level="info",
     )
@@ -0,0 +1,25 @@
+"""
+CORS middleware with set-based origin and header checks.
+"""
+
+from starlette.middleware.cors import CORSMiddleware
+
+
+class SetCORSMiddleware(CORSMiddleware):
+    """
+    Starlette's CORSMiddleware, but allowed origins and headers are held in
+    frozensets, so each request's origin (and each header named in a
+    preflight) is checked with a hash lookup instead of a list scan.
+    """
+
+    def __init__(self, app, **kwargs):
+        """
+        Initialize the middleware.
+
+        Args:
+            app: ASGI app
+            **kwargs: CORSMiddleware options
+        """
+        super().__init__(app, **kwargs)
+        self.allow_origins = frozenset(self.allow_origins)
+        self.allow_headers = frozenset(self.allow_headers)
@@ -3,9 +3,11 @@ Expense Categorization Model using NLP.
 This model uses TF-IDF and Naive Bayes to categorize expenses.
 """
 
+import asyncio
 import os
 import pickle
-from typing import Tuple
+from functools import lru_cache
+from typing import List, Tuple
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.naive_bayes import MultinomialNB
 from sklearn.pipeline import Pipeline
@@ -13,14 +15,27 @@ from sklearn.model_selection import train_test_split
 from sklearn.metrics import accuracy_score, classification_report
 
 from app.ml_models.training_data import TRAINING_DATA, CATEGORIES
+from app.core.batching import MicroBatcher
 from app.core.config import settings
 
+def normalize_description(description: str) -> str:
+    """
+    Normalize a description for caching: lower-case with whitespace
+    collapsed, so "STARBUCKS  Coffee" and "starbucks coffee" share one cache
+    entry. The vectorizer lower-cases and tokenizes the same way, so the
+    prediction is the one predict_batch gives for the raw description.
+    """
+    return " ".join(description.lower().split())
+
 
 class ExpenseCategorizer:
     """
     Expense categorization model using TF-IDF and Naive Bayes.
     """
 
+    # Fixed label set, as a tuple so the shared value cannot be mutated
+    categories: Tuple[str, ...] = tuple(CATEGORIES)
+
     def __init__(self):
         """Initialize the categorizer."""
         self.model = None
@@ -30,6 +45,11 @@ class ExpenseCategorizer:
         self.vectorizer_path = os.path.join(
             settings.MODEL_PATH, settings.VECTORIZER_MODEL
         )
+        # Descriptions repeat heavily (same merchants), so single
+        # predictions are memoized per normalized description
+        self._predict_cached = lru_cache(maxsize=settings.ML_PREDICT_CACHE_SIZE)(
+            self._predict_uncached
+        )
 
     def train(self, training_data=None):
         """
@@ -69,6 +89,7 @@ class ExpenseCategorizer:
 
         # Train model
         self.pipeline.fit(X_train, y_train)
+        self._predict_cached.cache_clear()
 
         # Evaluate
         y_pred = self.pipeline.predict(X_test)
@@ -84,12 +105,27 @@ class ExpenseCategorizer:
         """
         Predict category for a transaction description.
 
+        Results are cached per normalized description (see
+        normalize_description).
+
         Args:
             description: Transaction description
 
         Returns:
             Tuple of (predicted_category, confidence)
         """
+        return self._predict_cached(normalize_description(description))
+
+    def _predict_uncached(self, description: str) -> Tuple[str, float]:
+        """Run the model on one (normalized) description."""
+        return self.predict_batch([description])[0]
+
+    def cache_info(self):
+        """Hit/miss statistics of the predict cache."""
+        return self._predict_cached.cache_info()
+
+    def _ensure_model(self):
+        """Load the saved model, training a new one if none exists."""
         if self.pipeline is None:
             self.load_model()
 
@@ -99,14 +135,13 @@ class ExpenseCategorizer:
             self.train()
             self.save_model()
 
-        # Predict
-        prediction = self.pipeline.predict([description])[0]
-
-        # Get confidence (probability)
-        probabilities = self.pipeline.predict_proba([description])[0]
-        confidence = max(probabilities)
-
-        return prediction, confidence
+    def warmup(self):
+        """
+        Make sure a model is loaded and run one throwaway prediction, so
+        the first request does not pay for loading or lazy initialization.
+        """
+        self._ensure_model()
+        self.predict_batch(["warmup"])
 
     def predict_batch(self, descriptions: list) -> list:
         """
@@ -118,12 +153,13 @@ class ExpenseCategorizer:
         Returns:
             List of tuples (predicted_category, confidence)
         """
-        if self.pipeline is None:
-            self.load_model()
+        self._ensure_model()
 
-        predictions = self.pipeline.predict(descriptions)
+        # One vectorize + predict_proba pass; the label is the argmax class
         probabilities = self.pipeline.predict_proba(descriptions)
-        confidences = [max(prob) for prob in probabilities]
+        best = probabilities.argmax(axis=1)
+        predictions = self.pipeline.classes_[best]
+        confidences = probabilities[range(len(best)), best]
 
         return list(zip(predictions, confidences))
 
@@ -146,6 +182,7 @@ class ExpenseCategorizer:
         if os.path.exists(self.model_path):
             with open(self.model_path, "rb") as f:
                 self.pipeline = pickle.load(f)
+            self._predict_cached.cache_clear()
             print(f"Model loaded from {self.model_path}")
             return True
         else:
@@ -154,13 +191,27 @@ class ExpenseCategorizer:
 
     def get_categories(self):
         """Get list of all possible categories."""
-        return CATEGORIES
+        return list(self.categories)
 
 
 # Global instance
 categorizer = ExpenseCategorizer()
 
 
+async def _predict_batch_in_thread(descriptions: List[str]) -> list:
+    """Run predict_batch off the event loop (it is CPU-bound)."""
+    return await asyncio.to_thread(categorizer.predict_batch, descriptions)
+
+
+# Coalesces concurrent single predictions into one vectorized predict_batch
+# call; TF-IDF + Naive Bayes on N descriptions costs little more than on one
+batcher = MicroBatcher(
+    _predict_batch_in_thread,
+    max_size=settings.ML_BATCH_MAX_SIZE,
+    max_wait=settings.ML_BATCH_MAX_WAIT_MS / 1000,
+)
+
+
 # Initialize model on module import
 def initialize_model():
     """Initialize the categorization model."""
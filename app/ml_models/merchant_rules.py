@@ -0,0 +1,55 @@
+"""
+Keyword rules for well-known merchants.
+Descriptions naming one of these merchants are categorized by a single
+regex scan, without running the ML model.
+"""
+
+import re
+from typing import Optional
+
+# Merchant keywords per category. Matching is case-insensitive on whole
+# words; when rules overlap at the same position, the earlier category wins
+# (so "Uber Eats" is Food, not Transport). A rule overrides the model, so
+# merchants whose names are ordinary words ("Target", "Steam") are only
+# matched in merchant-specific forms.
+MERCHANT_RULES = {
+    "Food": [
+        "uber eats", "doordash", "grubhub", "swiggy", "zomato",
+        "starbucks", "mcdonald'?s", "burger king", "kfc", "domino'?s",
+        "pizza hut", "taco bell", "chipotle", "panera", "dunkin",
+    ],
+    "Transport": ["uber", "lyft", "ola cab", "petrol", "parking", "toll"],
+    "Entertainment": [
+        "netflix", "spotify", "disney plus", "hulu", "youtube premium",
+        "playstation", "xbox", "steampowered", "steam store", "audible",
+    ],
+    "Shopping": [
+        "walmart", "target store", r"target\.com", "best buy", "ikea", "home depot",
+    ],
+    "Education": ["udemy", "coursera", "tuition"],
+    "Travel": ["airbnb", "hotel", "resort", "cruise"],
+}
+
+# One alternation with a named group per category
+_CATEGORY_GROUPS = {f"c{index}": category for index, category in enumerate(MERCHANT_RULES)}
+_MERCHANT_PATTERN = re.compile(
+    "|".join(
+        rf"(?P<{group}>\b(?:{'|'.join(MERCHANT_RULES[category])})\b)"
+        for group, category in _CATEGORY_GROUPS.items()
+    ),
+    re.IGNORECASE,
+)
+
+
+def match_merchant(description: str) -> Optional[str]:
+    """
+    Category for a description naming a known merchant.
+
+    Args:
+        description: Transaction description
+
+    Returns:
+        Category name, or None if no rule matches
+    """
+    match = _MERCHANT_PATTERN.search(description)
+    return _CATEGORY_GROUPS[match.lastgroup] if match else None
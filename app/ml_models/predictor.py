@@ -3,16 +3,88 @@ Expense Prediction Model using historical data.
 Predicts future expenses based on past spending patterns.
 """
 
+import asyncio
+import json
+import time
+from collections import defaultdict
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 from dateutil.relativedelta import relativedelta
-from typing import Dict, List, Tuple
-from sqlalchemy.orm import Session
-
+from typing import Dict, List, Sequence, Tuple
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.batching import MicroBatcher
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.store import store
 from app.models.transaction import Transaction
 from app.ml_models.training_data import CATEGORIES
 
+# Allowed range for the months parameter of spending trends
+MAX_TREND_MONTHS = 24
+TRENDS_CACHE_TTL = 300  # Seconds; writes invalidate sooner
+# Trends versions outlive any cached trends keyed by them
+TRENDS_VERSION_TTL = 86400
+
+
+# Columns loaded for predictions, in DataFrame column order
+HISTORY_COLUMNS = (Transaction.amount, Transaction.category, Transaction.transaction_date)
+
+
+async def _trends_key(user_id: int, months: int) -> str:
+    """
+    Cache key for a user's trends over a window. Keys embed the user's
+    trends version, so a write invalidates every window at once, and a
+    read that started before the write can only refill an obsolete key.
+    """
+    version = await store.get(f"trendsver:{user_id}") or "0"
+    return f"trends:{user_id}:{version}:{months}"
+
+
+async def _load_recent_expenses(user_ids: List[int]) -> List[List[Tuple]]:
+    """
+    Load the last six months of expenses for several users in one query.
+
+    Args:
+        user_ids: Users to load, possibly with repeats
+
+    Returns:
+        (amount, category, date) rows for each user, in input order
+    """
+    six_months_ago = datetime.now() - timedelta(days=180)
+
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            select(Transaction.user_id, *HISTORY_COLUMNS).where(
+                Transaction.user_id.in_(set(user_ids)),
+                Transaction.transaction_type == "expense",
+                Transaction.transaction_date >= six_months_ago.date(),
+            )
+        )
+
+    by_user = defaultdict(list)
+    for user_id, *history in result.all():
+        by_user[user_id].append(tuple(history))
+    return [by_user.get(user_id, []) for user_id in user_ids]
+
+
+# Coalesces concurrent prediction requests (from different users) into a
+# single history query
+_recent_expenses = MicroBatcher(
+    _load_recent_expenses,
+    max_size=settings.ML_BATCH_MAX_SIZE,
+    max_wait=settings.ML_BATCH_MAX_WAIT_MS / 1000,
+)
+
+
+def _history_frame(transactions: Sequence) -> pd.DataFrame:
+    """Build a DataFrame from (amount, category, date) rows."""
+    return pd.DataFrame(
+        [tuple(t) for t in transactions], columns=["amount", "category", "date"]
+    )
+
 
 class ExpensePredictor:
     """
@@ -24,14 +96,16 @@ class ExpensePredictor:
         """Initialize the predictor."""
         self.min_transactions = 5  # Minimum transactions needed for prediction
 
-    def predict_next_month(
-        self, db: Session, user_id: int, months_ahead: int = 1
+    async def predict_next_month(
+        self, user_id: int, months_ahead: int = 1
     ) -> Dict[str, any]:
         """
         Predict expenses for the next N months.
 
+        The history query is shared with concurrent predictions for other
+        users, so it runs in its own session.
+
         Args:
-            db: Database session
             user_id: User ID
             months_ahead: Number of months to predict
 
@@ -39,17 +113,7 @@ class ExpensePredictor:
             Dictionary with predictions by category
         """
         # Get historical transactions (last 6 months)
-        six_months_ago = datetime.now() - timedelta(days=180)
-
-        transactions = (
-            db.query(Transaction)
-            .filter(
-                Transaction.user_id == user_id,
-                Transaction.transaction_type == "expense",
-                Transaction.transaction_date >= six_months_ago.date(),
-            )
-            .all()
-        )
+        transactions = await _recent_expenses.submit(user_id)
 
         if len(transactions) < self.min_transactions:
             prediction_date = datetime.now().date() + relativedelta(months=months_ahead)
@@ -61,14 +125,18 @@ class ExpensePredictor:
                 "prediction_date": prediction_date,
             }
 
-        # Convert to DataFrame
-        df = pd.DataFrame(
-            [
-                {"amount": t.amount, "category": t.category, "date": t.transaction_date}
-                for t in transactions
-            ]
+        # pandas work is CPU-bound; keep it off the event loop
+        return await asyncio.to_thread(
+            self._predict_from_history, transactions, months_ahead
         )
 
+    def _predict_from_history(
+        self, transactions: Sequence, months_ahead: int
+    ) -> Dict[str, any]:
+        """Compute predictions from (amount, category, date) rows."""
+        # Convert to DataFrame
+        df = _history_frame(transactions)
+
         # Calculate predictions for each category
         predictions = {}
         category_stats = {}
@@ -137,8 +205,8 @@ class ExpensePredictor:
             "data_points": total_transactions,
         }
 
-    def get_spending_trends(
-        self, db: Session, user_id: int, months: int = 6
+    async def get_spending_trends(
+        self, db: AsyncSession, user_id: int, months: int = 6
     ) -> List[Dict]:
         """
         Analyze spending trends over time.
@@ -154,27 +222,59 @@ class ExpensePredictor:
         # Get transactions
         start_date = datetime.now() - timedelta(days=months * 30)
 
-        transactions = (
-            db.query(Transaction)
-            .filter(
+        result = await db.execute(
+            select(*HISTORY_COLUMNS).where(
                 Transaction.user_id == user_id,
                 Transaction.transaction_type == "expense",
                 Transaction.transaction_date >= start_date.date(),
             )
-            .all()
         )
+        transactions = result.all()
 
         if not transactions:
             return []
 
-        # Convert to DataFrame
-        df = pd.DataFrame(
-            [
-                {"amount": t.amount, "category": t.category, "date": t.transaction_date}
-                for t in transactions
-            ]
+        return await asyncio.to_thread(self._trends_from_history, transactions)
+
+    async def get_cached_spending_trends(
+        self, db: AsyncSession, user_id: int, months: int = 6
+    ) -> List[Dict]:
+        """
+        Spending trends, cached per user and window in the shared store.
+
+        Args:
+            db: Database session
+            user_id: User ID
+            months: Number of months to analyze
+
+        Returns:
+            List of trend data by category
+        """
+        key = await _trends_key(user_id, months)
+        cached = await store.get(key)
+        if cached is not None:
+            return json.loads(cached)
+
+        trends = await self.get_spending_trends(db, user_id, months)
+        await store.set(key, json.dumps(trends), ttl=TRENDS_CACHE_TTL)
+        return trends
+
+    async def invalidate_spending_trends(self, user_id: int) -> None:
+        """
+        Drop a user's cached trends. Call after their transactions change.
+
+        Args:
+            user_id: User ID
+        """
+        await store.set(
+            f"trendsver:{user_id}", str(time.time_ns()), ttl=TRENDS_VERSION_TTL
         )
 
+    def _trends_from_history(self, transactions: Sequence) -> List[Dict]:
+        """Compute per-category trends from (amount, category, date) rows."""
+        # Convert to DataFrame
+        df = _history_frame(transactions)
+
         df["month"] = pd.to_datetime(df["date"]).dt.to_period("M")
 
         # Analyze trends
@@ -217,8 +317,8 @@ class ExpensePredictor:
 
         return trends
 
-    def predict_category_for_month(
-        self, db: Session, user_id: int, category: str, target_month: datetime
+    async def predict_category_for_month(
+        self, db: AsyncSession, user_id: int, category: str, target_month: datetime
     ) -> Dict[str, any]:
         """
         Predict expenses for a specific category and month.
@@ -235,18 +335,17 @@ class ExpensePredictor:
         # Get historical data for this category
         one_year_ago = datetime.now() - timedelta(days=365)
 
-        transactions = (
-            db.query(Transaction)
-            .filter(
+        result = await db.execute(
+            select(Transaction.amount).where(
                 Transaction.user_id == user_id,
                 Transaction.transaction_type == "expense",
                 Transaction.category == category,
                 Transaction.transaction_date >= one_year_ago.date(),
             )
-            .all()
         )
+        amounts = result.scalars().all()
 
-        if len(transactions) < 3:
+        if len(amounts) < 3:
             return {
                 "category": category,
                 "predicted_amount": 0.0,
@@ -255,7 +354,6 @@ class ExpensePredictor:
             }
 
         # Calculate average
-        amounts = [t.amount for t in transactions]
         avg_amount = np.mean(amounts)
         std_amount = np.std(amounts)
 
@@ -272,7 +370,7 @@ class ExpensePredictor:
             "confidence": round(confidence, 2),
             "historical_average": round(avg_amount, 2),
             "std_deviation": round(std_amount, 2),
-            "transaction_count": len(transactions),
+            "transaction_count": len(amounts),
         }
 
 
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Enum
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Enum, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
@@ -19,7 +19,7 @@ class Account(Base):
     __tablename__ = "accounts"
 
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)  # Leads idx_user_account_id
     account_name = Column(String, nullable=False)
     account_type = Column(Enum(AccountType), nullable=False)
     balance = Column(Float, default=0.0)
@@ -27,6 +27,9 @@ class Account(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
+    # Serves per-user listing ordered by id and per-id ownership lookups
+    __table_args__ = (Index("idx_user_account_id", "user_id", "id"),)
+
     # Relationships
     user = relationship("User", back_populates="accounts")
     transactions = relationship(
@@ -28,5 +28,8 @@ class Budget(Base):
     # Relationship
     user = relationship("User", back_populates="budgets")
 
+    # Fetch server-generated timestamps via RETURNING on INSERT and UPDATE
+    __mapper_args__ = {"eager_defaults": True}
+
     def __repr__(self):
         return f"<Budget(id={self.id}, category={self.category}, limit={self.limit_amount})>"
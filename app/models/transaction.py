@@ -20,7 +20,7 @@ class Transaction(Base):
     __tablename__ = "transactions"
 
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)  # Leads the composite indexes
     account_id = Column(Integer, ForeignKey("accounts.id"), nullable=False, index=True)
     amount = Column(Float, nullable=False)
     transaction_type = Column(String, nullable=False)  # "income" or "expense"
@@ -32,8 +32,25 @@ class Transaction(Base):
 
     # Composite indexes for common query patterns
     __table_args__ = (
-        Index("idx_user_transaction_date", "user_id", "transaction_date"),
+        # Transaction list: newest first, keyset-paginated on (date, id).
+        # The included columns let the summary aggregate scan the index only
+        Index(
+            "idx_user_transaction_date_id",
+            user_id,
+            transaction_date.desc(),
+            id.desc(),
+            postgresql_include=["amount", "transaction_type", "category", "account_id"],
+        ),
         Index("idx_user_category_date", "user_id", "category", "transaction_date"),
+        # Budget spending: covers the filter and the summed amount
+        Index(
+            "idx_user_category_type_date",
+            "user_id",
+            "category",
+            "transaction_type",
+            "transaction_date",
+            postgresql_include=["amount"],
+        ),
     )
 
     # ML-related fields
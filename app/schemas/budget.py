@@ -14,7 +14,10 @@ class BudgetBase(BaseModel):
 
 class BudgetCreate(BudgetBase):
     """Schema for creating budget."""
-    pass
+
+    class Config:
+        extra = "forbid"  # Reject unknown fields instead of carrying them
+        frozen = True
 
 
 class BudgetUpdate(BaseModel):
@@ -24,6 +27,10 @@ class BudgetUpdate(BaseModel):
     period: Optional[BudgetPeriod] = None
     alert_threshold: Optional[float] = Field(None, ge=0, le=1)
 
+    class Config:
+        extra = "forbid"  # Reject unknown fields instead of carrying them
+        frozen = True
+
 
 class Budget(BudgetBase):
     """Complete budget schema."""
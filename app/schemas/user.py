@@ -16,6 +16,10 @@ class UserCreate(UserBase):
     """Schema for user registration."""
     password: str = Field(..., min_length=8, description="Password must be at least 8 characters")
 
+    class Config:
+        extra = "forbid"  # Reject unknown fields instead of carrying them
+        frozen = True
+
 
 # Schema for updating user
 class UserUpdate(BaseModel):
@@ -4,9 +4,14 @@ Free, no API key required, unlimited requests!
 API: https://www.frankfurter.app/
 """
 
+import asyncio
+import logging
 import httpx
-from typing import Dict, List, Optional
-from datetime import datetime, timedelta
+from typing import Dict, Optional, Sequence
+
+from app.core.cache import TTLCache
+
+logger = logging.getLogger(__name__)
 
 
 class CurrencyService:
@@ -23,8 +28,79 @@ class CurrencyService:
     def __init__(self):
         """Initialize currency service."""
         self.base_url = "https://api.frankfurter.app"
-        self._cache = {}
         self.cache_duration = 3600  # 1 hour cache (rates don't change that often)
+        self._rates_cache = TTLCache(maxsize=64, ttl=self.cache_duration)
+        self._currencies_cache = TTLCache(maxsize=1, ttl=86400)  # Currency list rarely changes
+        self._historical_cache = TTLCache(maxsize=4096, ttl=86400)  # Published rates are fixed
+        self._rate_tables: Dict[str, Dict] = {}  # Latest rates for every base, see load_rate_table
+        self._client: Optional[httpx.AsyncClient] = None
+    
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """
+        Shared HTTP client, created on first use.
+        Keeps connections alive (HTTP/2) so requests skip the TLS handshake.
+        """
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                http2=True,
+                limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+                timeout=5.0,
+            )
+        return self._client
+    
+    async def close(self) -> None:
+        """Close the shared HTTP client. Called on application shutdown."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+    
+    async def load_rate_table(self) -> bool:
+        """
+        Fetch the latest USD rates once and derive the rate table for every
+        supported base currency by cross-multiplication.
+        
+        The tables are rebuilt as a whole and swapped in, so readers always
+        see a complete set. Results are shared between requests and must
+        not be modified.
+        
+        Returns:
+            True if the tables were refreshed
+        """
+        try:
+            response = await self.client.get(f"{self.base_url}/latest", params={"from": "USD"})
+            response.raise_for_status()
+            data = response.json()
+        except Exception as e:
+            logger.warning("Could not load exchange rate table: %s", e)
+            return False
+        
+        usd_rates = {"USD": 1.0, **data["rates"]}
+        date = data.get("date")
+        tables = {}
+        for base, base_rate in usd_rates.items():
+            tables[base] = {
+                "base": base,
+                "date": date,
+                "rates": {
+                    code: float(f"{rate / base_rate:.6g}")
+                    for code, rate in usd_rates.items()
+                    if code != base
+                },
+                "source": "Frankfurter API (European Central Bank)"
+            }
+        
+        self._rate_tables = tables
+        return True
+    
+    async def refresh_rate_table(self) -> None:
+        """
+        Load the rate table now and keep it fresh. Runs as a background
+        task for the lifetime of the application.
+        """
+        while True:
+            await self.load_rate_table()
+            await asyncio.sleep(self.cache_duration)
     
     async def get_exchange_rates(self, base_currency: str = "USD") -> Dict:
         """
@@ -48,40 +124,44 @@ class CurrencyService:
                 }
             }
         """
-        cache_key = f"rates_{base_currency}"
+        cache_key = base_currency.upper()
+        
+        # Served from the preloaded table for all supported currencies
+        table = self._rate_tables.get(cache_key)
+        if table is not None:
+            return table
         
         # Check cache
-        if cache_key in self._cache:
-            cached_data, cached_time = self._cache[cache_key]
-            if datetime.now() - cached_time < timedelta(seconds=self.cache_duration):
-                return cached_data
+        cached_data = self._rates_cache.get(cache_key)
+        if cached_data is not None:
+            return cached_data
         
         try:
-            async with httpx.AsyncClient() as client:
-                # Get latest rates
-                response = await client.get(
-                    f"{self.base_url}/latest",
-                    params={"from": base_currency.upper()}
-                )
+            client = self.client
+            # Get latest rates
+            response = await client.get(
+                f"{self.base_url}/latest",
+                params={"from": base_currency.upper()}
+            )
                 
-                if response.status_code == 200:
-                    data = response.json()
+            if response.status_code == 200:
+                data = response.json()
                     
-                    result = {
-                        "base": data.get("base"),
-                        "date": data.get("date"),
-                        "rates": data.get("rates"),
-                        "source": "Frankfurter API (European Central Bank)"
-                    }
+                result = {
+                    "base": data.get("base"),
+                    "date": data.get("date"),
+                    "rates": data.get("rates"),
+                    "source": "Frankfurter API (European Central Bank)"
+                }
                     
-                    # Cache the result
-                    self._cache[cache_key] = (result, datetime.now())
-                    return result
-                else:
-                    return {
-                        "error": f"API returned status code {response.status_code}",
-                        "message": "Could not fetch exchange rates"
-                    }
+                # Cache the result
+                self._rates_cache.set(cache_key, result)
+                return result
+            else:
+                return {
+                    "error": f"API returned status code {response.status_code}",
+                    "message": "Could not fetch exchange rates"
+                }
         
         except Exception as e:
             return {
@@ -118,37 +198,37 @@ class CurrencyService:
             }
         """
         try:
-            async with httpx.AsyncClient() as client:
-                # Frankfurter can convert directly
-                response = await client.get(
-                    f"{self.base_url}/latest",
-                    params={
-                        "amount": amount,
-                        "from": from_currency.upper(),
-                        "to": to_currency.upper()
-                    }
-                )
+            client = self.client
+            # Frankfurter can convert directly
+            response = await client.get(
+                f"{self.base_url}/latest",
+                params={
+                    "amount": amount,
+                    "from": from_currency.upper(),
+                    "to": to_currency.upper()
+                }
+            )
                 
-                if response.status_code == 200:
-                    data = response.json()
+            if response.status_code == 200:
+                data = response.json()
                     
-                    converted_amount = data["rates"].get(to_currency.upper(), 0)
-                    rate = converted_amount / amount if amount > 0 else 0
+                converted_amount = data["rates"].get(to_currency.upper(), 0)
+                rate = converted_amount / amount if amount > 0 else 0
                     
-                    return {
-                        "amount": amount,
-                        "from": from_currency.upper(),
-                        "to": to_currency.upper(),
-                        "rate": round(rate, 6),
-                        "result": round(converted_amount, 2),
-                        "date": data.get("date"),
-                        "source": "Frankfurter API"
-                    }
-                else:
-                    return {
-                        "error": "Invalid currency code or API error",
-                        "message": f"Status code: {response.status_code}"
-                    }
+                return {
+                    "amount": amount,
+                    "from": from_currency.upper(),
+                    "to": to_currency.upper(),
+                    "rate": round(rate, 6),
+                    "result": round(converted_amount, 2),
+                    "date": data.get("date"),
+                    "source": "Frankfurter API"
+                }
+            else:
+                return {
+                    "error": "Invalid currency code or API error",
+                    "message": f"Status code: {response.status_code}"
+                }
         
         except Exception as e:
             return {
@@ -174,26 +254,33 @@ class CurrencyService:
         Example:
             get_historical_rates("2025-12-31", "USD")
         """
+        cache_key = (date, base_currency.upper())
+        cached_data = self._historical_cache.get(cache_key)
+        if cached_data is not None:
+            return cached_data
+        
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    f"{self.base_url}/{date}",
-                    params={"from": base_currency.upper()}
-                )
+            client = self.client
+            response = await client.get(
+                f"{self.base_url}/{date}",
+                params={"from": base_currency.upper()}
+            )
                 
-                if response.status_code == 200:
-                    data = response.json()
-                    return {
-                        "base": data.get("base"),
-                        "date": data.get("date"),
-                        "rates": data.get("rates"),
-                        "source": "Frankfurter API (Historical)"
-                    }
-                else:
-                    return {
-                        "error": "Date not available or invalid format",
-                        "message": "Use YYYY-MM-DD format for dates"
-                    }
+            if response.status_code == 200:
+                data = response.json()
+                result = {
+                    "base": data.get("base"),
+                    "date": data.get("date"),
+                    "rates": data.get("rates"),
+                    "source": "Frankfurter API (Historical)"
+                }
+                self._historical_cache.set(cache_key, result)
+                return result
+            else:
+                return {
+                    "error": "Date not available or invalid format",
+                    "message": "Use YYYY-MM-DD format for dates"
+                }
         
         except Exception as e:
             return {
@@ -208,19 +295,25 @@ class CurrencyService:
         Returns:
             Dictionary with currency codes and names
         """
+        cached_data = self._currencies_cache.get("currencies")
+        if cached_data is not None:
+            return cached_data
+        
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(f"{self.base_url}/currencies")
+            client = self.client
+            response = await client.get(f"{self.base_url}/currencies")
                 
-                if response.status_code == 200:
-                    currencies = response.json()
-                    return {
-                        "currencies": currencies,
-                        "count": len(currencies),
-                        "source": "Frankfurter API"
-                    }
-                else:
-                    return {"error": "Could not fetch currencies"}
+            if response.status_code == 200:
+                currencies = response.json()
+                result = {
+                    "currencies": currencies,
+                    "count": len(currencies),
+                    "source": "Frankfurter API"
+                }
+                self._currencies_cache.set("currencies", result)
+                return result
+            else:
+                return {"error": "Could not fetch currencies"}
         
         except Exception as e:
             return {"error": str(e)}
@@ -229,7 +322,7 @@ class CurrencyService:
         self, 
         amount: float, 
         from_currency: str, 
-        to_currencies: List[str]
+        to_currencies: Sequence[str]
     ) -> Dict:
         """
         Convert amount to multiple currencies at once.
@@ -242,41 +335,32 @@ class CurrencyService:
         Returns:
             Dictionary with conversions to all target currencies
         """
-        try:
-            async with httpx.AsyncClient() as client:
-                # Join currencies with comma
-                to_curr_str = ",".join([c.upper() for c in to_currencies])
-                
-                response = await client.get(
-                    f"{self.base_url}/latest",
-                    params={
-                        "amount": amount,
-                        "from": from_currency.upper(),
-                        "to": to_curr_str
-                    }
-                )
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    
-                    conversions = {}
-                    for currency, value in data["rates"].items():
-                        conversions[currency] = {
-                            "amount": round(value, 2),
-                            "rate": round(value / amount, 6) if amount > 0 else 0
-                        }
-                    
-                    return {
-                        "amount": amount,
-                        "from": from_currency.upper(),
-                        "conversions": conversions,
-                        "date": data.get("date")
-                    }
-                else:
-                    return {"error": "Conversion failed"}
+        # All targets come from the cached latest rates for the base, so
+        # repeated calls (e.g. /popular) need no request at all
+        rates_data = await self.get_exchange_rates(from_currency)
+        if "error" in rates_data:
+            return {"error": "Conversion failed"}
         
-        except Exception as e:
-            return {"error": str(e)}
+        rates = rates_data["rates"]
+        conversions = {}
+        base = from_currency.upper()
+        for currency in to_currencies:
+            currency = currency.upper()
+            # The rates table never lists the base itself
+            rate = 1.0 if currency == base else rates.get(currency)
+            if rate is None:
+                return {"error": f"Unsupported currency: {currency}"}
+            conversions[currency] = {
+                "amount": round(amount * rate, 2),
+                "rate": round(rate, 6) if amount > 0 else 0
+            }
+        
+        return {
+            "amount": amount,
+            "from": base,
+            "conversions": conversions,
+            "date": rates_data.get("date")
+        }
 
 
 # Global instance
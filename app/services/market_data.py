@@ -5,12 +5,32 @@ Supports Alpha Vantage for stocks and CoinGecko for cryptocurrency.
 
 import httpx
 import asyncio
-from typing import Dict, Optional, Any
+import logging
+from typing import Awaitable, Callable, Dict, Optional, Any
 from functools import lru_cache
-from datetime import datetime, timedelta
+from datetime import datetime
 import json
 
 from app.core.config import settings
+from app.core.store import store
+
+logger = logging.getLogger(__name__)
+
+# Map common symbols to CoinGecko IDs
+COINGECKO_IDS = {
+    "btc": "bitcoin",
+    "eth": "ethereum",
+    "usdt": "tether",
+    "bnb": "binancecoin",
+    "sol": "solana",
+    "ada": "cardano",
+    "xrp": "ripple",
+    "doge": "dogecoin",
+}
+
+# Quotes shown in the market overview (cryptos by CoinGecko ID)
+OVERVIEW_STOCKS = ("AAPL", "GOOGL", "MSFT")
+OVERVIEW_CRYPTOS = ("bitcoin", "ethereum")
 
 
 class MarketDataService:
@@ -21,9 +41,88 @@ class MarketDataService:
         self.alpha_vantage_base = "https://www.alphavantage.co/query"
         self.coingecko_base = "https://api.coingecko.com/api/v3"
         self.cache_duration = 300  # 5 minutes cache
-        self._cache = {}
         # Enhanced caching with longer duration for overview (15 minutes)
         self.overview_cache_duration = 900  # 15 minutes
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._client: Optional[httpx.AsyncClient] = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """
+        Shared HTTP client, created on first use.
+        Keeps connections alive (HTTP/2) so requests skip the TLS handshake.
+        """
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                http2=True,
+                limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+                timeout=10.0,
+            )
+        return self._client
+
+    async def close(self) -> None:
+        """Close the shared HTTP client. Called on application shutdown."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def _cached(
+        self,
+        key: str,
+        ttl: int,
+        fetch: Callable[[], Awaitable[Dict[str, Any]]],
+        cache_errors: bool = False,
+    ) -> Dict[str, Any]:
+        """
+        Return a cached result, or fetch and cache it.
+
+        Results live in the shared store, so all workers reuse them when
+        Redis is configured. Concurrent misses for the same key share a
+        single upstream fetch.
+
+        Args:
+            key: Store key
+            ttl: Time-to-live in seconds
+            fetch: Coroutine function producing the result
+            cache_errors: Also cache results containing an "error" key
+
+        Returns:
+            Cached or freshly fetched result
+        """
+        try:
+            cached = await store.get(key)
+        except Exception as e:
+            # A store outage degrades to uncached lookups, never to errors
+            logger.warning("Market cache read failed for %s: %s", key, e)
+            cached = None
+        if cached is not None:
+            logger.debug("Market cache hit: %s", key)
+            return json.loads(cached)
+
+        task = self._inflight.get(key)
+        if task is None:
+            logger.debug("Market cache miss: %s", key)
+            task = asyncio.ensure_future(self._fetch_and_store(key, ttl, fetch, cache_errors))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # Shielded so one cancelled caller does not cancel the shared fetch
+        return await asyncio.shield(task)
+
+    async def _fetch_and_store(
+        self,
+        key: str,
+        ttl: int,
+        fetch: Callable[[], Awaitable[Dict[str, Any]]],
+        cache_errors: bool,
+    ) -> Dict[str, Any]:
+        """Fetch a result and store it unless it is an uncacheable error."""
+        result = await fetch()
+        if cache_errors or "error" not in result:
+            try:
+                await store.set(key, json.dumps(result), ttl=ttl)
+            except Exception as e:
+                logger.warning("Market cache write failed for %s: %s", key, e)
+        return result
 
     async def get_stock_price(self, symbol: str) -> Dict[str, Any]:
         """
@@ -35,14 +134,15 @@ class MarketDataService:
         Returns:
             Dictionary with stock data
         """
-        cache_key = f"stock_{symbol}"
-
-        # Check cache
-        if cache_key in self._cache:
-            cached_data, cached_time = self._cache[cache_key]
-            if datetime.now() - cached_time < timedelta(seconds=self.cache_duration):
-                return cached_data
-
+        symbol = symbol.upper()
+        return await self._cached(
+            f"mkt:stock:{symbol}",
+            self.cache_duration,
+            lambda: self._fetch_stock_price(symbol),
+        )
+
+    async def _fetch_stock_price(self, symbol: str) -> Dict[str, Any]:
+        """Fetch a stock quote from Alpha Vantage (uncached, upper-case symbol)."""
         # Check if API key is configured
         if not settings.ALPHA_VANTAGE_API_KEY:
             return {
@@ -52,37 +152,36 @@ class MarketDataService:
             }
 
         try:
-            async with httpx.AsyncClient(timeout=5.0) as client:
-                params = {
-                    "function": "GLOBAL_QUOTE",
-                    "symbol": symbol.upper(),
-                    "apikey": settings.ALPHA_VANTAGE_API_KEY,
+            params = {
+                "function": "GLOBAL_QUOTE",
+                "symbol": symbol,
+                "apikey": settings.ALPHA_VANTAGE_API_KEY,
+            }
+
+            response = await self.client.get(
+                self.alpha_vantage_base, params=params, timeout=5.0
+            )
+            data = response.json()
+
+            if "Global Quote" in data and data["Global Quote"]:
+                quote = data["Global Quote"]
+                result = {
+                    "symbol": symbol,
+                    "price": float(quote.get("05. price", 0)),
+                    "change": float(quote.get("09. change", 0)),
+                    "change_percent": quote.get("10. change percent", "0%"),
+                    "volume": int(quote.get("06. volume", 0)),
+                    "last_updated": quote.get("07. latest trading day"),
+                    "source": "Alpha Vantage",
                 }
 
-                response = await client.get(self.alpha_vantage_base, params=params)
-                data = response.json()
-
-                if "Global Quote" in data and data["Global Quote"]:
-                    quote = data["Global Quote"]
-                    result = {
-                        "symbol": symbol.upper(),
-                        "price": float(quote.get("05. price", 0)),
-                        "change": float(quote.get("09. change", 0)),
-                        "change_percent": quote.get("10. change percent", "0%"),
-                        "volume": int(quote.get("06. volume", 0)),
-                        "last_updated": quote.get("07. latest trading day"),
-                        "source": "Alpha Vantage",
-                    }
-
-                    # Cache the result
-                    self._cache[cache_key] = (result, datetime.now())
-                    return result
-                else:
-                    return {
-                        "symbol": symbol,
-                        "error": "Symbol not found or API limit reached",
-                        "message": "Check if the symbol is correct or try again later",
-                    }
+                return result
+            else:
+                return {
+                    "symbol": symbol,
+                    "error": "Symbol not found or API limit reached",
+                    "message": "Check if the symbol is correct or try again later",
+                }
 
         except Exception as e:
             return {"symbol": symbol, "error": f"Error fetching stock data: {str(e)}"}
@@ -97,67 +196,55 @@ class MarketDataService:
         Returns:
             Dictionary with crypto data
         """
-        cache_key = f"crypto_{symbol}"
-
-        # Check cache
-        if cache_key in self._cache:
-            cached_data, cached_time = self._cache[cache_key]
-            if datetime.now() - cached_time < timedelta(seconds=self.cache_duration):
-                return cached_data
-
+        # Keyed by CoinGecko ID so aliases (e.g. 'btc' and 'bitcoin') share
+        # one cache entry and one in-flight fetch
+        key = symbol.lower()
+        coin_id = COINGECKO_IDS.get(key, key)
+        result = await self._cached(
+            f"mkt:crypto:{coin_id}",
+            self.cache_duration,
+            lambda: self._fetch_crypto_price(coin_id),
+        )
+        return {**result, "symbol": symbol if "error" in result else symbol.upper()}
+
+    async def _fetch_crypto_price(self, coin_id: str) -> Dict[str, Any]:
+        """Fetch a crypto price from CoinGecko by coin ID (uncached)."""
         try:
-            # Map common symbols to CoinGecko IDs
-            symbol_map = {
-                "btc": "bitcoin",
-                "eth": "ethereum",
-                "usdt": "tether",
-                "bnb": "binancecoin",
-                "sol": "solana",
-                "ada": "cardano",
-                "xrp": "ripple",
-                "doge": "dogecoin",
+            url = f"{self.coingecko_base}/simple/price"
+            params = {
+                "ids": coin_id,
+                "vs_currencies": "usd",
+                "include_24hr_change": "true",
+                "include_24hr_vol": "true",
+                "include_market_cap": "true",
             }
 
-            coin_id = symbol_map.get(symbol.lower(), symbol.lower())
+            response = await self.client.get(url, params=params)
+            data = response.json()
 
-            async with httpx.AsyncClient(timeout=10.0) as client:
-                url = f"{self.coingecko_base}/simple/price"
-                params = {
-                    "ids": coin_id,
-                    "vs_currencies": "usd",
-                    "include_24hr_change": "true",
-                    "include_24hr_vol": "true",
-                    "include_market_cap": "true",
+            if coin_id in data:
+                coin_data = data[coin_id]
+                result = {
+                    "symbol": coin_id.upper(),
+                    "name": coin_id.title(),
+                    "price": coin_data.get("usd", 0),
+                    "change_24h": coin_data.get("usd_24h_change", 0),
+                    "volume_24h": coin_data.get("usd_24h_vol", 0),
+                    "market_cap": coin_data.get("usd_market_cap", 0),
+                    "last_updated": datetime.now().isoformat(),
+                    "source": "CoinGecko",
                 }
 
-                response = await client.get(url, params=params)
-                data = response.json()
-
-                if coin_id in data:
-                    coin_data = data[coin_id]
-                    result = {
-                        "symbol": symbol.upper(),
-                        "name": coin_id.title(),
-                        "price": coin_data.get("usd", 0),
-                        "change_24h": coin_data.get("usd_24h_change", 0),
-                        "volume_24h": coin_data.get("usd_24h_vol", 0),
-                        "market_cap": coin_data.get("usd_market_cap", 0),
-                        "last_updated": datetime.now().isoformat(),
-                        "source": "CoinGecko",
-                    }
-
-                    # Cache the result
-                    self._cache[cache_key] = (result, datetime.now())
-                    return result
-                else:
-                    return {
-                        "symbol": symbol,
-                        "error": "Cryptocurrency not found",
-                        "message": "Check if the symbol is correct",
-                    }
+                return result
+            else:
+                return {
+                    "symbol": coin_id,
+                    "error": "Cryptocurrency not found",
+                    "message": "Check if the symbol is correct",
+                }
 
         except Exception as e:
-            return {"symbol": symbol, "error": f"Error fetching crypto data: {str(e)}"}
+            return {"symbol": coin_id, "error": f"Error fetching crypto data: {str(e)}"}
 
     async def get_market_overview(self) -> Dict[str, Any]:
         """
@@ -167,78 +254,64 @@ class MarketDataService:
         Returns:
             Dictionary with market overview data
         """
-        cache_key = "market_overview"
-
-        # Check enhanced cache first (15 minutes for overview)
-        if cache_key in self._cache:
-            cached_data, cached_time = self._cache[cache_key]
-            if datetime.now() - cached_time < timedelta(
-                seconds=self.overview_cache_duration
-            ):
-                return cached_data
-
+        # Fallback results are cached too, so a failing upstream is not
+        # retried on every request
+        return await self._cached(
+            "mkt:overview",
+            self.overview_cache_duration,
+            self._fetch_market_overview,
+            cache_errors=True,
+        )
+
+    async def _fetch_market_overview(self) -> Dict[str, Any]:
+        """Build the market overview from live quotes (uncached)."""
         try:
-            # Get major stocks and cryptos in parallel
-            stocks = ["AAPL", "GOOGL", "MSFT"]
-            cryptos = ["bitcoin", "ethereum"]
-
-            # Create tasks for parallel execution
-            stock_tasks = [self.get_stock_price(symbol) for symbol in stocks]
-            crypto_tasks = [self.get_crypto_price(symbol) for symbol in cryptos]
-
-            # Execute all requests in parallel with shorter timeout
-            try:
-                stock_results = await asyncio.wait_for(
-                    asyncio.gather(*stock_tasks, return_exceptions=True),
-                    timeout=3.0,  # 3 second timeout for all stock requests
-                )
-                crypto_results = await asyncio.wait_for(
-                    asyncio.gather(*crypto_tasks, return_exceptions=True),
-                    timeout=3.0,  # 3 second timeout for all crypto requests
-                )
-            except asyncio.TimeoutError:
-                # If timeout, use fallback data
-                return {
-                    "stocks": self._get_fallback_stocks(),
-                    "cryptocurrencies": self._get_fallback_cryptos(),
-                    "timestamp": datetime.now().isoformat(),
-                    "message": "Using fallback data - API timeout",
-                }
-
-            # Filter out errors and exceptions
+            # Fetch every stock and crypto concurrently under one deadline
+            stock_tasks = [
+                asyncio.ensure_future(self.get_stock_price(symbol))
+                for symbol in OVERVIEW_STOCKS
+            ]
+            crypto_tasks = [
+                asyncio.ensure_future(self.get_crypto_price(symbol))
+                for symbol in OVERVIEW_CRYPTOS
+            ]
+            done, pending = await asyncio.wait(
+                stock_tasks + crypto_tasks, timeout=3.0
+            )
+            # Late quotes still finish in the background and fill the cache
+            for task in pending:
+                task.cancel()
+
+            def quote(task):
+                if task not in done or task.exception() is not None:
+                    return None
+                result = task.result()
+                return result if "error" not in result else None
+
+            # Fall back per symbol, so one failing quote does not replace
+            # the whole overview
+            fallback_stocks = {s["symbol"]: s for s in self._get_fallback_stocks()}
+            fallback_cryptos = {
+                COINGECKO_IDS[c["symbol"].lower()]: c
+                for c in self._get_fallback_cryptos()
+            }
             stock_data = [
-                s
-                for s in stock_results
-                if s and isinstance(s, dict) and "error" not in s
+                quote(task) or fallback_stocks[symbol]
+                for symbol, task in zip(OVERVIEW_STOCKS, stock_tasks)
             ]
             crypto_data = [
-                c
-                for c in crypto_results
-                if c and isinstance(c, dict) and "error" not in c
+                quote(task) or fallback_cryptos[symbol]
+                for symbol, task in zip(OVERVIEW_CRYPTOS, crypto_tasks)
             ]
 
-            # If we got some data, return it; otherwise use fallback
-            if stock_data or crypto_data:
-                result = {
-                    "stocks": stock_data if stock_data else self._get_fallback_stocks(),
-                    "cryptocurrencies": crypto_data
-                    if crypto_data
-                    else self._get_fallback_cryptos(),
-                    "timestamp": datetime.now().isoformat(),
-                }
-                # Cache the successful result
-                self._cache[cache_key] = (result, datetime.now())
-                return result
-            else:
-                result = {
-                    "stocks": self._get_fallback_stocks(),
-                    "cryptocurrencies": self._get_fallback_cryptos(),
-                    "timestamp": datetime.now().isoformat(),
-                    "message": "Using fallback data - API error",
-                }
-                # Cache fallback result for shorter time
-                self._cache[cache_key] = (result, datetime.now())
-                return result
+            result = {
+                "stocks": stock_data,
+                "cryptocurrencies": crypto_data,
+                "timestamp": datetime.now().isoformat(),
+            }
+            if any(q["source"] == "fallback" for q in stock_data + crypto_data):
+                result["message"] = "Using fallback data for unavailable symbols"
+            return result
 
         except Exception as e:
             result = {
@@ -248,8 +321,6 @@ class MarketDataService:
                 "error": f"Error fetching market overview: {str(e)}",
                 "message": "Using fallback data",
             }
-            # Cache fallback result for shorter time
-            self._cache[cache_key] = (result, datetime.now())
             return result
 
     def _get_fallback_stocks(self) -> list:
@@ -0,0 +1,100 @@
+"""
+Tests for MicroBatcher.
+"""
+
+import asyncio
+
+import pytest
+
+from app.core.batching import MicroBatcher
+
+
+class RecordingHandler:
+    """Batch handler that records each batch and doubles every item."""
+
+    def __init__(self):
+        self.batches = []
+
+    async def __call__(self, items):
+        self.batches.append(list(items))
+        return [item * 2 for item in items]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_submits_share_one_batch():
+    handler = RecordingHandler()
+    batcher = MicroBatcher(handler, max_size=10, max_wait=0.01)
+
+    results = await asyncio.gather(*(batcher.submit(i) for i in range(5)))
+
+    assert results == [0, 2, 4, 6, 8]
+    assert handler.batches == [[0, 1, 2, 3, 4]]
+
+
+@pytest.mark.asyncio
+async def test_full_batch_runs_without_waiting():
+    handler = RecordingHandler()
+    # A timer this long would fail the test if a full batch waited for it
+    batcher = MicroBatcher(handler, max_size=3, max_wait=60)
+
+    results = await asyncio.wait_for(
+        asyncio.gather(*(batcher.submit(i) for i in range(3))), timeout=1
+    )
+
+    assert results == [0, 2, 4]
+    assert handler.batches == [[0, 1, 2]]
+
+
+@pytest.mark.asyncio
+async def test_overflow_starts_a_new_batch():
+    handler = RecordingHandler()
+    batcher = MicroBatcher(handler, max_size=2, max_wait=0.01)
+
+    results = await asyncio.gather(*(batcher.submit(i) for i in range(5)))
+
+    assert results == [0, 2, 4, 6, 8]
+    assert handler.batches == [[0, 1], [2, 3], [4]]
+
+
+@pytest.mark.asyncio
+async def test_handler_error_reaches_every_caller():
+    async def failing(items):
+        raise ValueError("model unavailable")
+
+    batcher = MicroBatcher(failing, max_size=10, max_wait=0.01)
+
+    results = await asyncio.gather(
+        *(batcher.submit(i) for i in range(3)), return_exceptions=True
+    )
+
+    assert all(isinstance(r, ValueError) for r in results)
+
+
+@pytest.mark.asyncio
+async def test_cancelled_caller_does_not_affect_the_rest():
+    handler = RecordingHandler()
+    batcher = MicroBatcher(handler, max_size=10, max_wait=0.01)
+
+    cancelled = asyncio.ensure_future(batcher.submit(1))
+    kept = asyncio.ensure_future(batcher.submit(2))
+    await asyncio.sleep(0)
+    cancelled.cancel()
+
+    assert await kept == 4
+    assert cancelled.cancelled()
+    assert handler.batches == [[1, 2]]
+
+
+@pytest.mark.asyncio
+async def test_wrong_result_count_fails_every_caller():
+    async def short(items):
+        return [item * 2 for item in items[:-1]]
+
+    batcher = MicroBatcher(short, max_size=10, max_wait=0.01)
+
+    results = await asyncio.wait_for(
+        asyncio.gather(*(batcher.submit(i) for i in range(3)), return_exceptions=True),
+        timeout=1,
+    )
+
+    assert all(isinstance(r, RuntimeError) for r in results)
@@ -0,0 +1,73 @@
+"""
+Tests for the in-process TTL cache and the shared store's fallback mode.
+"""
+
+import time
+
+import pytest
+
+from app.core.cache import TTLCache
+from app.core.store import SharedStore
+
+
+def test_entries_expire(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(time, "monotonic", lambda: now[0])
+    cache = TTLCache(maxsize=10, ttl=5)
+
+    cache.set("a", 1)
+    cache.set("b", 2, ttl=20)
+    now[0] += 10
+
+    assert cache.get("a") is None
+    assert cache.get("b") == 2
+
+
+def test_non_positive_ttl_is_not_stored():
+    cache = TTLCache(maxsize=10, ttl=5)
+
+    cache.set("a", 1, ttl=0)
+
+    assert cache.get("a") is None
+
+
+def test_full_cache_evicts_oldest_entry():
+    cache = TTLCache(maxsize=2, ttl=60)
+
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.set("c", 3)
+
+    assert cache.get("a") is None
+    assert cache.get("b") == 2
+    assert cache.get("c") == 3
+
+
+def test_incr_keeps_the_first_expiry(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(time, "monotonic", lambda: now[0])
+    cache = TTLCache(maxsize=10, ttl=60)
+
+    assert cache.incr("n", ttl=10) == 1
+    now[0] += 6
+    assert cache.incr("n", ttl=10) == 2
+    now[0] += 6
+    assert cache.incr("n", ttl=10) == 1
+
+
+@pytest.mark.asyncio
+async def test_store_falls_back_to_local_cache():
+    store = SharedStore("")
+
+    assert not store.is_shared
+    await store.set("k", "v", ttl=60)
+    assert await store.get("k") == "v"
+    assert await store.getdel("k") == "v"
+    assert await store.get("k") is None
+
+    assert await store.incr("n", ttl=60) == 1
+    assert await store.incr("n", ttl=60) == 2
+    await store.set("x", "1", ttl=60)
+    await store.delete("n", "x")
+    assert await store.get("n") is None
+    assert await store.get("x") is None
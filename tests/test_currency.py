@@ -0,0 +1,65 @@
+"""
+Tests for the currency endpoints. Exchange rates are seeded into the
+service's rate table, so no request reaches the Frankfurter API.
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api.deps import get_current_active_user
+from app.main import app
+from app.services.currency import currency_service
+
+RATES = {
+    "USD": {
+        "base": "USD",
+        "date": "2026-01-20",
+        "rates": {"EUR": 0.92, "GBP": 0.79, "JPY": 149.5, "CNY": 7.19,
+                  "CAD": 1.35, "AUD": 1.52, "INR": 83.1},
+    },
+    "EUR": {
+        "base": "EUR",
+        "date": "2026-01-20",
+        "rates": {"USD": 1.087, "GBP": 0.86, "JPY": 162.5, "CNY": 7.82,
+                  "CAD": 1.47, "AUD": 1.65, "INR": 90.3},
+    },
+}
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(currency_service, "_rate_tables", RATES)
+    app.dependency_overrides[get_current_active_user] = lambda: None
+    yield TestClient(app, base_url="http://localhost")
+    app.dependency_overrides.clear()
+
+
+def test_popular_with_popular_base(client):
+    response = client.get("/api/v1/currency/popular", params={"base": "EUR"})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["base"] == "EUR"
+    assert body["rates"]["EUR"] == 1.0
+    assert body["rates"]["GBP"] == 0.86
+
+
+def test_convert_multiple_includes_base(client):
+    response = client.get(
+        "/api/v1/currency/convert-multiple",
+        params={"amount": 10, "from": "USD", "to": "USD,EUR"},
+    )
+
+    assert response.status_code == 200
+    conversions = response.json()["conversions"]
+    assert conversions["USD"]["amount"] == 10
+    assert conversions["EUR"]["amount"] == 9.2
+
+
+def test_convert_multiple_rejects_unknown_currency(client):
+    response = client.get(
+        "/api/v1/currency/convert-multiple",
+        params={"amount": 10, "from": "USD", "to": "EUR,XYZ"},
+    )
+
+    assert response.status_code == 400
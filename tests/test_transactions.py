@@ -0,0 +1,25 @@
+"""
+Tests for transaction list cursors.
+"""
+
+from datetime import date
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+from app.api.v1.transactions import _decode_cursor, _encode_cursor
+
+
+def test_cursor_round_trip():
+    row = SimpleNamespace(transaction_date=date(2024, 1, 31), id=42)
+
+    assert _decode_cursor(_encode_cursor(row)) == (date(2024, 1, 31), 42)
+
+
+@pytest.mark.parametrize("cursor", ["zzz", "bm90LWEtY3Vyc29y", ""])
+def test_malformed_cursor_is_rejected(cursor):
+    with pytest.raises(HTTPException) as exc_info:
+        _decode_cursor(cursor)
+
+    assert exc_info.value.status_code == 400